@@ -9,7 +9,9 @@ app_license = "MIT"
 # ------------------
 
 # include js, css files in header of desk.html
-app_include_css = "/assets/ui_ux_upgrade/css/modern-ui.css"
+# Only the critical chunk of modern-ui.css is loaded up front; feature chunks
+# are loaded on demand by modern-ui.js (rebuild with `bench ui-ux-build-css`)
+app_include_css = "/assets/ui_ux_upgrade/css/chunks/critical.css"
 app_include_js = "/assets/ui_ux_upgrade/js/modern-ui.js"
 
 # include js, css files in header of web template
@@ -23,7 +25,8 @@ website_theme_scss = "ui_ux_upgrade/public/scss/website"
 page_js = {
     "desk": "public/js/desk.js",
     "login": "public/js/login.js",
-    "setup": "public/js/setup.js"
+    "setup": "public/js/setup.js",
+    "ui-ux-profiler": "public/js/profiler.js"
 }
 
 # include js in doctype views
@@ -55,12 +58,20 @@ role_home_page = {
 # ------------
 
 after_install = "ui_ux_upgrade.install.after_install"
+after_migrate = "ui_ux_upgrade.install.after_migrate"
 
 # Uninstallation
 # ------------
 
 before_uninstall = "ui_ux_upgrade.uninstall.before_uninstall"
 
+# Boot Session
+# ------------
+
+# Effective UI Settings and theme of the user, read by modern-ui.js to skip
+# disabled features and apply the theme without waiting on a request
+boot_session = "ui_ux_upgrade.boot.boot_session"
+
 # Desk Notifications
 # ------------------
 
@@ -83,9 +94,67 @@ doc_events = {
     },
     "Company": {
         "on_update": "ui_ux_upgrade.events.company_updated"
+    },
+    "UI Settings": {
+        "on_update": [
+            "ui_ux_upgrade.ui_settings.ui_settings.clear_ui_settings_cache",
+            "ui_ux_upgrade.suggestions.suggestions.clear_suggestions_cache",
+            "ui_ux_upgrade.overrides.clear_desktop_cache",
+            "ui_ux_upgrade.boot.clear_ui_preferences_cache"
+        ],
+        "on_trash": [
+            "ui_ux_upgrade.ui_settings.ui_settings.clear_ui_settings_cache",
+            "ui_ux_upgrade.suggestions.suggestions.clear_suggestions_cache",
+            "ui_ux_upgrade.overrides.clear_desktop_cache",
+            "ui_ux_upgrade.boot.clear_ui_preferences_cache"
+        ]
+    },
+    "Workspace": {
+        "on_update": "ui_ux_upgrade.overrides.clear_desktop_cache",
+        "on_trash": "ui_ux_upgrade.overrides.clear_desktop_cache"
+    },
+    "Dashboard Chart": {
+        "on_update": "ui_ux_upgrade.metrics.chart_rollups.clear_chart_rollups",
+        "on_trash": "ui_ux_upgrade.metrics.chart_rollups.clear_chart_rollups"
+    },
+    "Custom DocPerm": {
+        "on_update": [
+            "ui_ux_upgrade.overrides.clear_desktop_cache",
+            "ui_ux_upgrade.metrics.chart_rollups.clear_chart_rollups"
+        ],
+        "on_trash": [
+            "ui_ux_upgrade.overrides.clear_desktop_cache",
+            "ui_ux_upgrade.metrics.chart_rollups.clear_chart_rollups"
+        ]
+    },
+    "Theme Manager": {
+        "on_update": [
+            "ui_ux_upgrade.theme_manager.theme_stats.on_theme_change",
+            "ui_ux_upgrade.theme_manager.theme_compiler.on_theme_update",
+            "ui_ux_upgrade.suggestions.suggestions.clear_suggestions_cache",
+            "ui_ux_upgrade.boot.clear_ui_preferences_cache"
+        ],
+        "on_trash": [
+            "ui_ux_upgrade.theme_manager.theme_stats.on_theme_change",
+            "ui_ux_upgrade.theme_manager.theme_compiler.on_theme_trash",
+            "ui_ux_upgrade.suggestions.suggestions.clear_suggestions_cache",
+            "ui_ux_upgrade.boot.clear_ui_preferences_cache"
+        ]
     }
 }
 
+# UI Suggestion Analyzers
+# -----------------------
+# Each analyzer takes the current UI settings and returns a list of suggestions.
+# Other apps can register their own under the same hook.
+
+ui_ux_suggestion_analyzers = [
+    "ui_ux_upgrade.suggestions.suggestions.analyze_theme_configuration",
+    "ui_ux_upgrade.suggestions.suggestions.analyze_performance_settings",
+    "ui_ux_upgrade.suggestions.suggestions.analyze_accessibility_settings",
+    "ui_ux_upgrade.suggestions.suggestions.analyze_user_experience"
+]
+
 # Scheduled Tasks
 # ---------------
 
@@ -96,7 +165,15 @@ scheduler_events = {
     ],
     "weekly": [
         "ui_ux_upgrade.tasks.weekly_optimization"
-    ]
+    ],
+    "cron": {
+        "* * * * *": [
+            "ui_ux_upgrade.metrics.dashboard_metrics.refresh_dashboard_snapshot"
+        ],
+        "*/15 * * * *": [
+            "ui_ux_upgrade.metrics.chart_rollups.refresh_stale_chart_rollups"
+        ]
+    }
 }
 
 # Overriding Methods
@@ -73,6 +73,15 @@ create_dist_dir() {
     print_success "Distribution directory created: $PACKAGE_DIR"
 }
 
+# Build CSS chunks and print their sizes
+build_css_chunks() {
+    print_status "Building CSS chunks..."
+    
+    python3 -m ui_ux_upgrade.css_build
+    
+    print_success "CSS chunks built"
+}
+
 # Copy files to package
 copy_files() {
     print_status "Copying files to package..."
@@ -256,6 +265,7 @@ main() {
     
     # Create distribution
     create_dist_dir
+    build_css_chunks
     copy_files
     create_install_instructions
     create_version_file
@@ -0,0 +1,68 @@
+"""
+Tests for the modern-ui.css chunk build
+"""
+
+import json
+import os
+
+from ui_ux_upgrade.css_build import build_css, minify_css, split_chunks
+
+SOURCE = """/* Header comment */
+/* @chunk critical */
+.a { color: red; }
+/* @chunk dashboard */
+.dashboard-card { padding: 1rem; }
+/* @chunk critical */
+.b { color: blue; }
+"""
+
+def test_split_chunks_groups_sections_by_marker():
+    chunks = split_chunks(SOURCE)
+
+    assert set(chunks) == {"critical", "dashboard"}
+    assert ".a" in chunks["critical"] and ".b" in chunks["critical"]
+    assert chunks["critical"].index(".a") < chunks["critical"].index(".b")
+    assert ".dashboard-card" in chunks["dashboard"]
+
+def test_split_chunks_drops_header_before_first_marker():
+    chunks = split_chunks(SOURCE)
+
+    assert all("Header comment" not in css for css in chunks.values())
+
+def test_split_chunks_without_markers():
+    assert split_chunks(".a { color: red; }") == {}
+
+def test_minify_css_strips_comments_and_whitespace():
+    css = """
+    /* comment */
+    .a,
+    .b > .c {
+        color: red;
+        margin: 0 auto;
+    }
+    """
+
+    assert minify_css(css) == ".a,.b>.c{color:red;margin:0 auto}"
+
+def test_minify_css_keeps_descendant_pseudo_class_combinator():
+    # `.a :hover` (any hovered descendant) differs from `.a:hover`
+    assert minify_css(".a :hover { color: red; }") == ".a :hover{color:red}"
+
+def test_minify_css_keeps_media_query_spacing():
+    css = "@media (max-width: 768px) { .a { padding: 1rem; } }"
+
+    assert minify_css(css) == "@media (max-width:768px){.a{padding:1rem}}"
+
+def test_build_css_writes_chunks_and_size_report(tmp_path):
+    (tmp_path / "modern-ui.css").write_text(SOURCE)
+
+    report = build_css(str(tmp_path))
+
+    chunks_path = tmp_path / "chunks"
+    assert (chunks_path / "critical.css").read_text() == ".a{color:red}.b{color:blue}\n"
+    assert (chunks_path / "dashboard.css").read_text() == ".dashboard-card{padding:1rem}\n"
+
+    with open(os.path.join(chunks_path, "size-report.json")) as f:
+        assert json.load(f) == report
+    assert report["chunks"]["critical"]["bytes"] == len(".a{color:red}.b{color:blue}\n")
+    assert report["modern-ui.css"]["bytes"] == len(SOURCE.encode())
@@ -0,0 +1,23 @@
+"""
+Tests for dashboard metric deltas
+"""
+
+import pytest
+
+pytest.importorskip("frappe")
+
+from ui_ux_upgrade.metrics.dashboard_metrics import get_metrics_delta
+
+def test_get_metrics_delta_keeps_changed_values():
+    previous = {"active_users": 4, "themes": 3, "pending_suggestions": 2}
+    metrics = {"active_users": 5, "themes": 3, "pending_suggestions": 0}
+
+    assert get_metrics_delta(previous, metrics) == {"active_users": 5, "pending_suggestions": 0}
+
+def test_get_metrics_delta_includes_new_metrics():
+    assert get_metrics_delta({}, {"update_available": 1}) == {"update_available": 1}
+
+def test_get_metrics_delta_unchanged():
+    metrics = {"active_users": 5, "themes": 3}
+
+    assert get_metrics_delta(dict(metrics), metrics) == {}
@@ -0,0 +1,331 @@
+"""
+Tests for release fetching and caching in the upgrade checker, against a local stub server
+"""
+
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+frappe = pytest.importorskip("frappe")
+
+import requests
+
+from ui_ux_upgrade.upgrade_checker import upgrade_checker
+from ui_ux_upgrade.upgrade_checker.upgrade_checker import (
+    RELEASE_CACHE_KEY,
+    CircuitBreaker,
+    fetch_release,
+    get_latest_release,
+    read_bench_release,
+    refresh_release_cache,
+    update_release_entry,
+    write_bench_release,
+)
+
+RELEASE = {
+    "tag_name": "v1.2.0",
+    "name": "1.2.0",
+    "body": "Release notes",
+    "html_url": "https://example.com/releases/v1.2.0",
+    "published_at": "2026-01-01T00:00:00Z",
+}
+ETAG = '"release-v1.2.0"'
+
+class StubReleaseServer(ThreadingHTTPServer):
+    """Serves RELEASE with an ETag; `responses` queues status codes to answer first"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubReleaseHandler)
+        self.requests = []
+        self.responses = []
+        self.delay = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/releases/latest"
+
+class StubReleaseHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        if server.responses:
+            self.send_response(server.responses.pop(0))
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        body = json.dumps(RELEASE).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def release_server():
+    server = StubReleaseServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(upgrade_checker.random, "uniform", lambda low, high: 0)
+
+class FakeCache:
+    """The parts of the Redis cache the release cache uses, in memory"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return copy.deepcopy(self.values.get(key))
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.values[key] = copy.deepcopy(value)
+
+    def delete_value(self, key):
+        self.values.pop(key, None)
+
+    def lpush(self, key, value):
+        self.values.setdefault(key, []).insert(0, value)
+
+    def ltrim(self, key, start, stop):
+        self.values[key] = self.values.get(key, [])[start:stop + 1]
+
+@pytest.fixture
+def site(monkeypatch, tmp_path, release_server):
+    """A site whose release URL is the stub server, with an in-memory cache"""
+    cache = FakeCache()
+    enqueued = []
+
+    monkeypatch.setattr(frappe, "cache", lambda: cache)
+    monkeypatch.setattr(frappe, "log_error", lambda *args, **kwargs: None)
+    monkeypatch.setattr(frappe.local, "conf", frappe._dict(ui_ux_upgrade_release_url=release_server.url), raising=False)
+    monkeypatch.setattr(frappe.local, "sites_path", str(tmp_path), raising=False)
+    monkeypatch.setattr(upgrade_checker, "release_circuit", CircuitBreaker(failure_threshold=3, cooldown=60))
+    monkeypatch.setattr(upgrade_checker, "enqueue_upgrade_check", lambda **kwargs: enqueued.append(kwargs))
+
+    return frappe._dict(cache=cache, enqueued=enqueued, sites_path=str(tmp_path))
+
+@pytest.fixture
+def bench_site(site, monkeypatch, release_server):
+    """A site on the default release URL, which shares the bench release file"""
+    monkeypatch.setattr(upgrade_checker, "RELEASE_URL", release_server.url)
+    del frappe.local.conf["ui_ux_upgrade_release_url"]
+    return site
+
+def make_entry(fetched_at):
+    return {
+        "release": {field: RELEASE.get(field) for field in upgrade_checker.RELEASE_FIELDS},
+        "etag": ETAG,
+        "last_modified": None,
+        "fetched_at": fetched_at,
+    }
+
+def test_fetch_release_revalidates_with_etag(release_server):
+    status, release, headers = fetch_release(release_server.url)
+
+    assert status == 200
+    assert release["tag_name"] == "v1.2.0"
+    assert headers["ETag"] == ETAG
+
+    status, release, headers = fetch_release(release_server.url, etag=ETAG)
+
+    assert status == 304
+    assert release is None
+    assert release_server.requests[-1]["If-None-Match"] == ETAG
+
+def test_fetch_release_retries_retryable_status(release_server, no_backoff):
+    release_server.responses = [503, 502]
+
+    status, release, headers = fetch_release(release_server.url, retries=2)
+
+    assert status == 200
+    assert release["tag_name"] == "v1.2.0"
+    assert len(release_server.requests) == 3
+
+def test_fetch_release_returns_last_status_when_retries_run_out(release_server, no_backoff):
+    release_server.responses = [503, 503, 503]
+
+    status, release, headers = fetch_release(release_server.url, retries=2)
+
+    assert status == 503
+    assert release is None
+    assert len(release_server.requests) == 3
+
+def test_fetch_release_does_not_retry_read_timeouts(release_server, no_backoff):
+    release_server.delay = 0.5
+
+    with pytest.raises(requests.ReadTimeout):
+        fetch_release(release_server.url, timeout=(1, 0.1), retries=2)
+
+    assert len(release_server.requests) == 1
+
+def test_fetch_release_stops_retrying_at_deadline(release_server, no_backoff):
+    release_server.responses = [503, 503, 503]
+
+    # No retry fits once the deadline leaves less than a connect timeout
+    status, release, headers = fetch_release(
+        release_server.url, timeout=(1, 1), retries=2, deadline=0.5
+    )
+
+    assert status == 503
+    assert len(release_server.requests) == 1
+
+def test_update_release_entry_from_200():
+    entry = update_release_entry(
+        None, 200, {**RELEASE, "assets": []}, {"ETag": ETAG, "Last-Modified": "Thu, 01 Jan 2026"}
+    )
+
+    assert entry["release"]["tag_name"] == "v1.2.0"
+    assert "assets" not in entry["release"]
+    assert entry["etag"] == ETAG
+    assert entry["last_modified"] == "Thu, 01 Jan 2026"
+
+def test_update_release_entry_from_304_refreshes_timestamp_only():
+    entry = {"release": RELEASE, "etag": ETAG, "last_modified": None, "fetched_at": 0}
+
+    updated = update_release_entry(entry, 304, None, {})
+
+    assert updated["release"] == RELEASE
+    assert updated["etag"] == ETAG
+    assert updated["fetched_at"] > 0
+    assert entry["fetched_at"] == 0
+
+def test_update_release_entry_rejects_unusable_responses():
+    assert update_release_entry(None, 304, None, {}) is None
+    assert update_release_entry({"release": RELEASE}, 503, None, {}) is None
+
+def test_get_latest_release_serves_fresh_entry_without_fetching(site, release_server):
+    site.cache.set_value(RELEASE_CACHE_KEY, make_entry(time.time()))
+
+    release = get_latest_release()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert release_server.requests == []
+    assert site.enqueued == []
+
+def test_get_latest_release_serves_stale_entry_while_revalidating(site, release_server):
+    site.cache.set_value(RELEASE_CACHE_KEY, make_entry(0))
+
+    release = get_latest_release()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert release_server.requests == []
+    assert site.enqueued == [{}]
+
+def test_get_latest_release_fetches_stale_entry_without_stale_while_revalidate(site, release_server):
+    frappe.local.conf.ui_ux_upgrade_stale_while_revalidate = 0
+    site.cache.set_value(RELEASE_CACHE_KEY, make_entry(0))
+
+    release = get_latest_release()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert len(release_server.requests) == 1
+    assert site.enqueued == []
+
+def test_get_latest_release_fetches_on_cold_cache(site, release_server):
+    release = get_latest_release()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert len(release_server.requests) == 1
+    assert site.cache.get_value(RELEASE_CACHE_KEY)["etag"] == ETAG
+
+def test_refresh_release_cache_revalidates_with_304(site, release_server):
+    site.cache.set_value(RELEASE_CACHE_KEY, make_entry(0))
+
+    release = refresh_release_cache()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert release_server.requests[-1]["If-None-Match"] == ETAG
+    entry = site.cache.get_value(RELEASE_CACHE_KEY)
+    assert entry["etag"] == ETAG
+    assert entry["fetched_at"] > 0
+
+def test_refresh_release_cache_keeps_entry_on_failed_fetch(site, release_server):
+    site.cache.set_value(RELEASE_CACHE_KEY, make_entry(0))
+    release_server.responses = [404]
+
+    release = refresh_release_cache()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert site.cache.get_value(RELEASE_CACHE_KEY)["fetched_at"] == 0
+
+def test_refresh_release_cache_reuses_fresh_bench_file(bench_site, release_server):
+    write_bench_release(bench_site.sites_path, make_entry(time.time()))
+
+    release = refresh_release_cache()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert release_server.requests == []
+    assert bench_site.cache.get_value(RELEASE_CACHE_KEY)["etag"] == ETAG
+
+def test_refresh_release_cache_fetches_over_stale_bench_file(bench_site, release_server):
+    write_bench_release(bench_site.sites_path, make_entry(0))
+
+    release = refresh_release_cache()
+
+    assert release["tag_name"] == "v1.2.0"
+    assert len(release_server.requests) == 1
+    # The fetch is shared with the other sites on the bench
+    assert read_bench_release(bench_site.sites_path)["fetched_at"] > 0
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+def test_circuit_breaker_half_opens_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+
+    breaker.opened_at -= 60
+
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
+
+def test_circuit_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 60
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+def test_circuit_breaker_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+
+    breaker.record_success()
+
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
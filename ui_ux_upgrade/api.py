@@ -4,13 +4,14 @@ API endpoints for UI/UX Upgrade features
 
 import frappe
 from frappe import _
-from ui_ux_upgrade.upgrade_checker.upgrade_checker import check_for_upgrades, get_upgrade_instructions
-from ui_ux_upgrade.suggestions.suggestions import get_ui_suggestions, get_suggestion_details
+from ui_ux_upgrade.upgrade_checker.upgrade_checker import get_cached_upgrade_status, get_upgrade_instructions
+from ui_ux_upgrade.suggestions.suggestions import get_ui_suggestions, get_suggestion_details, sync_suggestion_records
+from ui_ux_upgrade.metrics.dashboard_metrics import get_dashboard_response
 
 @frappe.whitelist()
 def get_upgrade_status():
     """Get current upgrade status"""
-    return check_for_upgrades()
+    return get_cached_upgrade_status()
 
 @frappe.whitelist()
 def get_upgrade_help():
@@ -27,11 +28,39 @@ def get_filtered_suggestions(category=None, priority=None):
     """Get filtered suggestions"""
     return get_suggestion_details(category, priority)
 
+@frappe.whitelist()
+def get_dashboard_data(version=None):
+    """Get dashboard metrics from the precomputed snapshot.
+
+    Clients pass the snapshot version they hold as `version` or in an
+    If-None-Match header and get a 304, a delta, or the full snapshot.
+    """
+    if not version:
+        etag = frappe.get_request_header("If-None-Match") or ""
+        version = etag.removeprefix("W/").strip('"') or None
+    
+    response = get_dashboard_response(version)
+    
+    if response is None:
+        # The client already has this snapshot; don't send the metrics again
+        frappe.local.response["http_status_code"] = 304
+        return
+    
+    return response
+
 @frappe.whitelist()
 def create_upgrade_check_record():
     """Create an upgrade check record"""
     try:
-        upgrade_data = check_for_upgrades()
+        # Never blocks on GitHub: on a cold cache the queued check saves the record
+        upgrade_data = get_cached_upgrade_status(record=True)
+        
+        if upgrade_data.get("queued"):
+            return {
+                "success": True,
+                "queued": True,
+                "message": _("Checking for updates. The upgrade check record will be created when the check completes.")
+            }
         
         if upgrade_data.get("success"):
             doc = frappe.get_doc({
@@ -72,26 +101,13 @@ def create_suggestions_records():
         if not suggestions_data.get("success"):
             return suggestions_data
         
-        created_suggestions = []
-        
-        for suggestion in suggestions_data.get("suggestions", []):
-            doc = frappe.get_doc({
-                "doctype": "UI Suggestions",
-                "category": suggestion.get("category"),
-                "priority": suggestion.get("priority").title(),
-                "title": suggestion.get("title"),
-                "description": suggestion.get("description"),
-                "action": suggestion.get("action"),
-                "icon": suggestion.get("icon"),
-                "status": "Pending"
-            })
-            doc.insert()
-            created_suggestions.append(doc.name)
+        result = sync_suggestion_records(suggestions_data.get("suggestions", []))
         
         return {
             "success": True,
-            "message": _("{0} suggestion records created").format(len(created_suggestions)),
-            "suggestions": created_suggestions
+            "message": _("{0} suggestion records created").format(len(result["created"])),
+            "suggestions": result["created"],
+            "updated": result["updated"]
         }
         
     except Exception as e:
@@ -99,4 +115,4 @@ def create_suggestions_records():
         return {
             "success": False,
             "message": _("Failed to create suggestion records: {0}").format(str(e))
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,114 @@
+"""
+Boot session hook for UI/UX Upgrade
+Ships each user's effective UI settings and theme with the desk boot so the front end
+only loads what is enabled and applies the theme without extra round trips
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from ui_ux_upgrade.theme_manager.theme_compiler import BUNDLE_CACHE_KEY, get_theme_slug
+from ui_ux_upgrade.ui_settings.ui_settings import UI_SETTINGS_FLAGS, get_ui_settings
+
+# Per-user preferences, stored as user defaults with this prefix. Users can pick
+# a theme and switch effects off for themselves, not on when the site disabled them
+USER_PREFERENCES = ("theme",) + UI_SETTINGS_FLAGS
+USER_DEFAULT_PREFIX = "ui_ux_"
+
+# Resolved preferences are cached per user and settings version; bumping the
+# version on UI Settings or theme changes invalidates every user at once
+USER_PREFERENCES_CACHE_KEY = "ui_ux_upgrade:user_ui_preferences"
+SETTINGS_VERSION_KEY = "ui_ux_upgrade:ui_settings_version"
+USER_PREFERENCES_CACHE_TTL = 24 * 60 * 60
+
+def boot_session(bootinfo):
+    """Add the user's effective UI settings to the desk boot info"""
+    bootinfo.ui_ux_settings = get_user_ui_preferences(frappe.session.user)
+
+def get_effective_ui_settings():
+    """Get UI settings normalised for the front end"""
+    settings = get_ui_settings()
+    
+    effective = {flag: settings[flag] for flag in UI_SETTINGS_FLAGS}
+    effective["modern_theme"] = settings.modern_theme
+    return effective
+
+def get_user_ui_preferences(user):
+    """Get the effective UI settings and theme of a user, cached per settings version"""
+    cache_key = get_user_preferences_cache_key(user)
+    preferences = frappe.cache().get_value(cache_key)
+    
+    if preferences is None:
+        preferences = resolve_user_ui_preferences(user)
+        frappe.cache().set_value(cache_key, preferences, expires_in_sec=USER_PREFERENCES_CACHE_TTL)
+    
+    return preferences
+
+def resolve_user_ui_preferences(user):
+    """Combine site UI settings with the user's own preferences"""
+    preferences = get_effective_ui_settings()
+    user_defaults = frappe.defaults.get_defaults_for(user) or {}
+    
+    for flag in UI_SETTINGS_FLAGS:
+        user_value = user_defaults.get(USER_DEFAULT_PREFIX + flag)
+        if user_value is not None and not cint(user_value):
+            preferences[flag] = 0
+    
+    theme = user_defaults.get(USER_DEFAULT_PREFIX + "theme")
+    if not theme and preferences["modern_theme"] != "Default":
+        theme = get_theme_slug(preferences["modern_theme"])
+    
+    preferences["theme"] = theme or None
+    preferences["theme_bundle"] = None
+    if theme:
+        bundle = frappe.cache().hget(BUNDLE_CACHE_KEY, theme)
+        preferences["theme_bundle"] = frappe.safe_decode(bundle) if bundle else None
+    
+    return preferences
+
+@frappe.whitelist()
+def set_ui_preference(key, value):
+    """Save a UI preference for the current user"""
+    if key not in USER_PREFERENCES:
+        frappe.throw(_("Unknown UI preference: {0}").format(key))
+    
+    if key != "theme":
+        value = cint(value)
+    
+    frappe.defaults.set_user_default(USER_DEFAULT_PREFIX + key, value)
+    frappe.cache().delete_value(get_user_preferences_cache_key(frappe.session.user))
+    frappe.cache().hdel("bootinfo", frappe.session.user)
+    
+    return get_user_ui_preferences(frappe.session.user)
+
+def get_user_preferences_cache_key(user):
+    """Cache key of a user's preferences for the current settings version"""
+    return f"{USER_PREFERENCES_CACHE_KEY}:{get_settings_version()}:{user}"
+
+def get_settings_version():
+    """Current version of the site-wide UI settings"""
+    version = frappe.cache().get_value(SETTINGS_VERSION_KEY)
+    
+    if not version:
+        version = bump_settings_version()
+    
+    return version
+
+def bump_settings_version():
+    """Start a new settings version, leaving older per-user entries to expire"""
+    version = frappe.generate_hash(length=10)
+    frappe.cache().set_value(SETTINGS_VERSION_KEY, version)
+    return version
+
+def clear_ui_preferences_cache(doc=None, method=None):
+    """Invalidate every user's cached preferences (UI Settings and theme changes)"""
+    def invalidate():
+        bump_settings_version()
+        # Frappe caches each user's whole bootinfo, preferences included
+        frappe.cache().delete_key("bootinfo")
+    
+    invalidate()
+    if doc:
+        # Again once the change is committed, in case another request cached
+        # pre-commit values in the meantime
+        frappe.db.after_commit.add(invalidate)
@@ -0,0 +1,119 @@
+"""
+Bench commands for UI/UX Upgrade
+"""
+
+import click
+import frappe
+from frappe.commands import pass_context
+from multiprocessing import Pool
+
+@click.command("ui-ux-fleet-upgrade-check")
+@click.option("--processes", type=int, default=4, help="Sites checked in parallel")
+@pass_context
+def fleet_upgrade_check(context, processes):
+    """Fetch the latest release once and record an upgrade check on every site"""
+    import requests
+    from ui_ux_upgrade.upgrade_checker.upgrade_checker import (
+        RELEASE_URL,
+        fetch_release,
+        read_bench_release,
+        update_release_entry,
+        write_bench_release,
+    )
+    
+    sites_path = "."
+    sites = context.sites or frappe.utils.get_sites()
+    
+    # One fetch for the whole bench, revalidated against the shared file
+    entry = read_bench_release(sites_path)
+    try:
+        status, release, headers = fetch_release(
+            RELEASE_URL,
+            etag=entry.get("etag") if entry else None,
+            last_modified=entry.get("last_modified") if entry else None,
+        )
+    except requests.RequestException as e:
+        click.secho(f"Release fetch failed: {e}", fg="red")
+        raise SystemExit(1)
+    
+    entry = update_release_entry(entry, status, release, headers)
+    
+    if not entry:
+        click.secho(f"Release fetch failed with status {status}", fg="red")
+        raise SystemExit(1)
+    
+    write_bench_release(sites_path, entry)
+    
+    with Pool(processes=max(1, min(processes, len(sites)))) as pool:
+        results = pool.map(check_site, [(site, entry, sites_path) for site in sites])
+    
+    print_summary(results)
+    
+    for site, result in results:
+        if result.get("skipped"):
+            click.secho(f"Skipped {site}: {result['message']}", fg="yellow")
+    
+    if any(not result.get("success") for site, result in results):
+        raise SystemExit(1)
+
+def check_site(args):
+    """Worker: seed a site's release cache and record its upgrade check"""
+    from ui_ux_upgrade.upgrade_checker.upgrade_checker import (
+        RELEASE_CACHE_KEY,
+        RELEASE_CACHE_MAX_AGE,
+        RELEASE_URL,
+        check_for_upgrades,
+        insert_upgrade_check_records,
+    )
+    
+    site, entry, sites_path = args
+    frappe.init(site=site, sites_path=sites_path)
+    
+    try:
+        frappe.connect()
+        
+        if "ui_ux_upgrade" not in frappe.get_installed_apps():
+            return site, {"success": True, "skipped": True, "message": "ui_ux_upgrade is not installed"}
+        
+        # The shared entry is for the default endpoint only; sites pointed
+        # elsewhere keep checking their own
+        if frappe.conf.get("ui_ux_upgrade_release_url") not in (None, "", RELEASE_URL):
+            return site, {"success": True, "skipped": True, "message": "uses ui_ux_upgrade_release_url"}
+        
+        frappe.cache().set_value(RELEASE_CACHE_KEY, entry, expires_in_sec=RELEASE_CACHE_MAX_AGE)
+        
+        result = check_for_upgrades()
+        insert_upgrade_check_records([result])
+        frappe.db.commit()
+        return site, result
+    except Exception as e:
+        return site, {"success": False, "message": str(e)}
+    finally:
+        frappe.destroy()
+
+def print_summary(results):
+    """Print one row per site"""
+    rows = [("Site", "Current", "Latest", "Update", "Status")]
+    for site, result in sorted(results):
+        rows.append((
+            site,
+            result.get("current_version") or "-",
+            result.get("latest_version") or "-",
+            "yes" if result.get("update_available") else "no",
+            "skipped" if result.get("skipped") else
+            "ok" if result.get("success") else result.get("message", "error")
+        ))
+    
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        click.echo("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+@click.command("ui-ux-build-css")
+def build_css_chunks():
+    """Split modern-ui.css into critical and feature chunks and report sizes"""
+    from ui_ux_upgrade.css_build import build_css, format_report
+    
+    for line in format_report(build_css()):
+        click.echo(line)
+
+commands = [fleet_upgrade_check, build_css_chunks]
@@ -0,0 +1,79 @@
+"""
+CSS build for UI/UX Upgrade
+Splits modern-ui.css into a critical chunk and on-demand feature chunks
+
+Run with `bench ui-ux-build-css` or `python -m ui_ux_upgrade.css_build`.
+"""
+
+import json
+import os
+import re
+
+PUBLIC_CSS_PATH = os.path.join(os.path.dirname(__file__), "public", "css")
+SOURCE_FILE = "modern-ui.css"
+CHUNKS_FOLDER = "chunks"
+SIZE_REPORT_FILE = "size-report.json"
+
+# `/* @chunk name */` starts a section belonging to chunk `name`
+CHUNK_MARKER = re.compile(r"/\*\s*@chunk\s+([\w-]+)\s*\*/")
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from CSS"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Space before a colon can be a descendant combinator (`.a :hover`), so
+    # only strip the space after it
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+def split_chunks(css):
+    """Group the sections of a stylesheet by their chunk marker"""
+    parts = CHUNK_MARKER.split(css)
+    # Anything before the first marker is the file header
+    chunks = {}
+    
+    for name, section in zip(parts[1::2], parts[2::2]):
+        chunks.setdefault(name, []).append(section)
+    
+    return {name: "".join(sections) for name, sections in chunks.items()}
+
+def build_css(css_path=PUBLIC_CSS_PATH):
+    """Write minified chunks and a size report; returns the report"""
+    with open(os.path.join(css_path, SOURCE_FILE)) as f:
+        source = f.read()
+    
+    output_path = os.path.join(css_path, CHUNKS_FOLDER)
+    os.makedirs(output_path, exist_ok=True)
+    
+    report = {
+        SOURCE_FILE: {"bytes": len(source.encode())},
+        "chunks": {}
+    }
+    
+    for name, css in split_chunks(source).items():
+        minified = minify_css(css)
+        with open(os.path.join(output_path, f"{name}.css"), "w") as f:
+            f.write(minified + "\n")
+        
+        report["chunks"][name] = {
+            "source_bytes": len(css.encode()),
+            "bytes": len(minified.encode()) + 1
+        }
+    
+    with open(os.path.join(output_path, SIZE_REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=4, sort_keys=True)
+        f.write("\n")
+    
+    return report
+
+def format_report(report):
+    """Size report as printable lines"""
+    lines = [f"{SOURCE_FILE}: {report[SOURCE_FILE]['bytes']} bytes"]
+    for name, sizes in sorted(report["chunks"].items()):
+        lines.append(f"  {name}.css: {sizes['bytes']} bytes (from {sizes['source_bytes']})")
+    return lines
+
+if __name__ == "__main__":
+    print("\n".join(format_report(build_css())))
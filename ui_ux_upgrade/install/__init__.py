@@ -1 +1,3 @@
 # Install Module
+
+from ui_ux_upgrade.install.after_install import after_install, after_migrate
@@ -0,0 +1,373 @@
+"""
+Install manifest for UI/UX Upgrade
+Declares the app's DocTypes, Pages and default themes, and applies them
+"""
+
+import frappe
+
+MODULE = "UI/UX Upgrade"
+
+SYSTEM_MANAGER_PERMISSION = {
+    "role": "System Manager",
+    "read": 1,
+    "write": 1,
+    "create": 1,
+    "delete": 1
+}
+
+DOCTYPES = [
+    {
+        "name": "UI Settings",
+        "issingle": 1,
+        "fields": [
+            {
+                "fieldname": "enable_animations",
+                "label": "Enable Animations",
+                "fieldtype": "Check",
+                "default": 1
+            },
+            {
+                "fieldname": "modern_theme",
+                "label": "Modern Theme",
+                "fieldtype": "Select",
+                "options": "Default\nDark\nLight\nCustom"
+            },
+            {
+                "fieldname": "enable_glassmorphism",
+                "label": "Enable Glassmorphism",
+                "fieldtype": "Check",
+                "default": 1
+            },
+            {
+                "fieldname": "enable_shadows",
+                "label": "Enable Shadows",
+                "fieldtype": "Check",
+                "default": 1
+            }
+        ]
+    },
+    {
+        "name": "Theme Manager",
+        "fields": [
+            {
+                "fieldname": "theme_name",
+                "label": "Theme Name",
+                "fieldtype": "Data",
+                "reqd": 1
+            },
+            {
+                "fieldname": "primary_color",
+                "label": "Primary Color",
+                "fieldtype": "Color"
+            },
+            {
+                "fieldname": "secondary_color",
+                "label": "Secondary Color",
+                "fieldtype": "Color"
+            },
+            {
+                "fieldname": "css_code",
+                "label": "Custom CSS",
+                "fieldtype": "Code",
+                "options": "CSS"
+            }
+        ]
+    },
+    {
+        "name": "Upgrade Check",
+        "is_submittable": 0,
+        "track_changes": 1,
+        "fields": [
+            {
+                "fieldname": "current_version",
+                "label": "Current Version",
+                "fieldtype": "Data",
+                "read_only": 1
+            },
+            {
+                "fieldname": "latest_version",
+                "label": "Latest Version",
+                "fieldtype": "Data",
+                "read_only": 1
+            },
+            {
+                "fieldname": "update_available",
+                "label": "Update Available",
+                "fieldtype": "Check",
+                "read_only": 1
+            },
+            {
+                "fieldname": "last_checked",
+                "label": "Last Checked",
+                "fieldtype": "Datetime",
+                "read_only": 1
+            },
+            {
+                "fieldname": "release_notes",
+                "label": "Release Notes",
+                "fieldtype": "Text Editor",
+                "read_only": 1
+            },
+            {
+                "fieldname": "release_url",
+                "label": "Release URL",
+                "fieldtype": "Data",
+                "read_only": 1
+            },
+            {
+                "fieldname": "status",
+                "label": "Status",
+                "fieldtype": "Select",
+                "options": "Pending\nChecked\nError",
+                "default": "Pending"
+            }
+        ],
+        "permissions": [SYSTEM_MANAGER_PERMISSION]
+    },
+    {
+        "name": "UI Suggestions",
+        "is_submittable": 0,
+        "track_changes": 1,
+        "fields": [
+            {
+                "fieldname": "category",
+                "label": "Category",
+                "fieldtype": "Select",
+                "options": "Theme\nPerformance\nAccessibility\nUser Experience\nGeneral",
+                "reqd": 1
+            },
+            {
+                "fieldname": "priority",
+                "label": "Priority",
+                "fieldtype": "Select",
+                "options": "High\nMedium\nLow",
+                "default": "Medium",
+                "reqd": 1
+            },
+            {
+                "fieldname": "title",
+                "label": "Title",
+                "fieldtype": "Data",
+                "reqd": 1
+            },
+            {
+                "fieldname": "description",
+                "label": "Description",
+                "fieldtype": "Text Editor",
+                "reqd": 1
+            },
+            {
+                "fieldname": "action",
+                "label": "Recommended Action",
+                "fieldtype": "Text",
+                "reqd": 1
+            },
+            {
+                "fieldname": "icon",
+                "label": "Icon",
+                "fieldtype": "Data"
+            },
+            {
+                "fieldname": "status",
+                "label": "Status",
+                "fieldtype": "Select",
+                "options": "Pending\nIn Progress\nCompleted\nDismissed",
+                "default": "Pending"
+            },
+            {
+                "fieldname": "completed_on",
+                "label": "Completed On",
+                "fieldtype": "Date",
+                "depends_on": "eval: doc.status == 'Completed'"
+            },
+            {
+                "fieldname": "notes",
+                "label": "Notes",
+                "fieldtype": "Text"
+            },
+            {
+                "fieldname": "suggestion_hash",
+                "label": "Suggestion Hash",
+                "fieldtype": "Data",
+                "hidden": 1,
+                "read_only": 1,
+                "search_index": 1
+            }
+        ],
+        "permissions": [
+            SYSTEM_MANAGER_PERMISSION,
+            {**SYSTEM_MANAGER_PERMISSION, "role": "Administrator"}
+        ]
+    }
+]
+
+PAGES = [
+    {
+        "name": "modern-dashboard",
+        "title": "Modern Dashboard",
+        "template": "modern-dashboard.html"
+    },
+    {
+        "name": "modern-login",
+        "title": "Modern Login",
+        "template": "modern-login.html"
+    },
+    {
+        "name": "modern-setup",
+        "title": "Modern Setup",
+        "template": "modern-setup.html"
+    },
+    {
+        "name": "ui-ux-profiler",
+        "page_name": "ui-ux-profiler",
+        "title": "Request Profiler",
+        "standard": "No",
+        "roles": [{"role": "System Manager"}]
+    }
+]
+
+DEFAULT_THEMES = [
+    {
+        "theme_name": "Modern Light",
+        "primary_color": "#2563eb",
+        "secondary_color": "#f8fafc"
+    },
+    {
+        "theme_name": "Modern Dark",
+        "primary_color": "#1e293b",
+        "secondary_color": "#334155"
+    },
+    {
+        "theme_name": "E-Mart Blue",
+        "primary_color": "#1e40af",
+        "secondary_color": "#dbeafe"
+    }
+]
+
+def apply_manifest(doctypes=None):
+    """Bring the site in line with the manifest, changing only what differs.
+
+    `doctypes` limits the run to the named DocTypes and skips pages and
+    themes. Returns the names of everything created or updated.
+    """
+    definitions = [d for d in DOCTYPES if not doctypes or d["name"] in doctypes]
+    changes = {"doctypes": apply_doctypes(definitions)}
+    
+    if not doctypes:
+        changes["pages"] = apply_pages(PAGES)
+        changes["themes"] = apply_themes(DEFAULT_THEMES)
+    
+    frappe.db.commit()
+    return changes
+
+def apply_doctypes(definitions):
+    """Create missing DocTypes, add fields missing from existing ones and
+    convert existing DocTypes the manifest declares as single"""
+    names = [definition["name"] for definition in definitions]
+    singles = {
+        doctype.name: doctype.issingle
+        for doctype in frappe.get_all("DocType", filters={"name": ["in", names]}, fields=["name", "issingle"])
+    }
+    existing = set(singles)
+    
+    # Field names of every existing DocType, in one query
+    existing_fields = {}
+    if existing:
+        for field in frappe.get_all(
+            "DocField",
+            filters={"parenttype": "DocType", "parent": ["in", list(existing)]},
+            fields=["parent", "fieldname"]
+        ):
+            existing_fields.setdefault(field.parent, set()).add(field.fieldname)
+    
+    changed = []
+    for definition in definitions:
+        if definition["name"] not in existing:
+            frappe.get_doc({
+                "doctype": "DocType",
+                "module": MODULE,
+                "custom": 1,
+                **definition
+            }).insert()
+            changed.append(definition["name"])
+            continue
+        
+        missing = [
+            field for field in definition["fields"]
+            if field["fieldname"] not in existing_fields.get(definition["name"], set())
+        ]
+        if missing:
+            doctype = frappe.get_doc("DocType", definition["name"])
+            for field in missing:
+                doctype.append("fields", field)
+            doctype.save()
+            changed.append(definition["name"])
+        
+        if definition.get("issingle") and not singles[definition["name"]]:
+            convert_to_single(definition, existing_fields.get(definition["name"], set()))
+            if definition["name"] not in changed:
+                changed.append(definition["name"])
+    
+    return changed
+
+def convert_to_single(definition, legacy_fields):
+    """Turn an existing DocType into a single document, keeping the values of
+    its most recently modified row. The old table is left in place."""
+    fieldnames = [
+        field["fieldname"] for field in definition["fields"]
+        if field["fieldname"] in legacy_fields
+    ]
+    legacy = frappe.get_all(
+        definition["name"], fields=fieldnames, order_by="modified desc", limit=1
+    ) if fieldnames else []
+    
+    doctype = frappe.get_doc("DocType", definition["name"])
+    doctype.issingle = 1
+    doctype.save()
+    
+    if legacy:
+        settings = frappe.get_single(definition["name"])
+        settings.update(legacy[0])
+        settings.save()
+
+def apply_pages(pages):
+    """Create missing Pages"""
+    existing = set(frappe.get_all(
+        "Page", filters={"name": ["in", [page["name"] for page in pages]]}, pluck="name"
+    ))
+    
+    created = []
+    for page in pages:
+        if page["name"] not in existing:
+            frappe.get_doc({"doctype": "Page", "module": MODULE, **page}).insert()
+            created.append(page["name"])
+    
+    return created
+
+def apply_themes(themes):
+    """Bulk insert default themes that don't exist yet"""
+    existing = set(frappe.get_all(
+        "Theme Manager",
+        filters={"theme_name": ["in", [theme["theme_name"] for theme in themes]]},
+        pluck="theme_name"
+    ))
+    missing = [theme for theme in themes if theme["theme_name"] not in existing]
+    
+    if missing:
+        now = frappe.utils.now()
+        frappe.db.bulk_insert(
+            "Theme Manager",
+            fields=[
+                "name", "creation", "modified", "owner", "modified_by", "docstatus",
+                "theme_name", "primary_color", "secondary_color"
+            ],
+            values=[
+                (
+                    frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", 0,
+                    theme["theme_name"], theme["primary_color"], theme["secondary_color"]
+                )
+                for theme in missing
+            ]
+        )
+    
+    return [theme["theme_name"] for theme in missing]
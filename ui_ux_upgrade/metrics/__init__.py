@@ -0,0 +1 @@
+# Metrics Module
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Dashboard chart rollups for UI/UX Upgrade
+Pre-aggregated Dashboard Chart series, refreshed in the background
+"""
+
+import frappe
+import hashlib
+import json
+import time
+from frappe.desk.doctype.dashboard_chart.dashboard_chart import get as get_chart_data
+from frappe.permissions import get_user_permissions
+
+# Chart series, one hash field per chart and permission scope
+CHART_ROLLUPS_KEY = "ui_ux_upgrade:chart_rollups"
+# Seconds a rollup may be served before it is recomputed, override with
+# `ui_ux_dashboard_max_staleness` in site_config.json
+CHART_ROLLUP_MAX_STALENESS = 15 * 60
+# Last read time per rollup field; rollups not read for this many seconds are
+# dropped instead of refreshed, and computed again on their next read
+CHART_ROLLUP_READS_KEY = "ui_ux_upgrade:chart_rollup_reads"
+CHART_ROLLUP_MAX_IDLE = 24 * 60 * 60
+
+def get_max_staleness():
+    return frappe.conf.get("ui_ux_dashboard_max_staleness") or CHART_ROLLUP_MAX_STALENESS
+
+def get_rollup_field(chart_name, user):
+    """Cache field for a chart as seen by a user.
+
+    Users see the same rows as everyone with their roles, so they share a
+    rollup, unless the rows depend on the user themselves: User Permissions,
+    owner-only DocPerms or permission query conditions on the chart's doctype.
+    """
+    if get_user_permissions(user) or is_chart_user_scoped(chart_name):
+        scope = ["user", user]
+    else:
+        scope = ["roles", sorted(frappe.get_roles(user))]
+    
+    signature = json.dumps([chart_name, scope])
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+def is_chart_user_scoped(chart_name):
+    """Whether a chart's data may differ between users with the same roles"""
+    chart = frappe.get_cached_doc("Dashboard Chart", chart_name)
+    
+    # Report and custom source charts run arbitrary code we can't inspect
+    if chart.chart_type in ("Report", "Custom"):
+        return True
+    
+    doctypes = {chart.document_type, chart.parent_document_type} - {None, ""}
+    return any(has_user_scoped_permissions(doctype) for doctype in doctypes)
+
+def has_user_scoped_permissions(doctype):
+    """Whether list queries on a doctype are filtered by the session user"""
+    conditions = frappe.get_hooks("permission_query_conditions") or {}
+    if conditions.get(doctype) or conditions.get("*"):
+        return True
+    
+    # Meta permissions already reflect Custom DocPerms where a site has them
+    return any(perm.if_owner for perm in frappe.get_meta(doctype).permissions)
+
+def get_chart_rollup(chart_name):
+    """Get a chart's pre-aggregated series for the current user.
+
+    Rollups within the staleness bound are served as is; older ones are
+    served while a background job recomputes them. Only a chart never seen
+    in this scope is computed inline.
+    """
+    user = frappe.session.user
+    field = get_rollup_field(chart_name, user)
+    rollup = frappe.cache().hget(CHART_ROLLUPS_KEY, field)
+    frappe.cache().hset(CHART_ROLLUP_READS_KEY, field, time.time())
+    
+    if rollup is None:
+        return compute_chart_rollup(chart_name, field, user)["data"]
+    
+    if time.time() - rollup["computed_at"] > get_max_staleness():
+        enqueue_chart_rollup(chart_name, field, user)
+    
+    return rollup["data"]
+
+def compute_chart_rollup(chart_name, field, user):
+    """Aggregate a chart's series and store it as a rollup"""
+    rollup = {
+        "chart_name": chart_name,
+        "user": user,
+        "data": get_chart_data(chart_name=chart_name, refresh=1),
+        "computed_at": time.time()
+    }
+    frappe.cache().hset(CHART_ROLLUPS_KEY, field, rollup)
+    return rollup
+
+def enqueue_chart_rollup(chart_name, field, user):
+    """Queue a rollup refresh, at most one per chart and scope"""
+    frappe.enqueue(
+        "ui_ux_upgrade.metrics.chart_rollups.refresh_chart_rollup",
+        queue="short",
+        job_id=f"ui_ux_chart_rollup::{field}",
+        deduplicate=True,
+        chart_name=chart_name,
+        field=field,
+        user=user
+    )
+
+def refresh_chart_rollup(chart_name, field, user):
+    """Background job: recompute a rollup as the user it is scoped to"""
+    frappe.set_user(user)
+    compute_chart_rollup(chart_name, field, user)
+
+def refresh_stale_chart_rollups():
+    """Recompute recently read rollups past the staleness bound and drop idle
+    ones; run by the scheduler"""
+    max_staleness = get_max_staleness()
+    now = time.time()
+    reads = {
+        frappe.safe_decode(field): last_read_at
+        for field, last_read_at in frappe.cache().hgetall(CHART_ROLLUP_READS_KEY).items()
+    }
+    
+    for field, rollup in frappe.cache().hgetall(CHART_ROLLUPS_KEY).items():
+        field = frappe.safe_decode(field)
+        last_read_at = reads.pop(field, None)
+    
+        if last_read_at is None or now - last_read_at > CHART_ROLLUP_MAX_IDLE:
+            frappe.cache().hdel(CHART_ROLLUPS_KEY, field)
+            frappe.cache().hdel(CHART_ROLLUP_READS_KEY, field)
+        elif now - rollup["computed_at"] > max_staleness:
+            enqueue_chart_rollup(rollup["chart_name"], field, rollup["user"])
+    
+    # Reads of rollups that have since been cleared
+    for field in reads:
+        frappe.cache().hdel(CHART_ROLLUP_READS_KEY, field)
+
+def clear_chart_rollups(doc=None, method=None):
+    """Drop all rollups; hooked to Dashboard Chart and Custom DocPerm changes"""
+    frappe.cache().delete_value(CHART_ROLLUPS_KEY)
+    frappe.cache().delete_value(CHART_ROLLUP_READS_KEY)
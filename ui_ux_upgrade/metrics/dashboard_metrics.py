@@ -0,0 +1,111 @@
+"""
+Dashboard metrics for UI/UX Upgrade
+Precomputes a per-site metric snapshot shared by every open dashboard
+"""
+
+import frappe
+import hashlib
+import json
+from ui_ux_upgrade.theme_manager.theme_stats import get_theme_stats
+from ui_ux_upgrade.upgrade_checker.upgrade_checker import get_cached_release_entry, check_for_upgrades
+
+DASHBOARD_SNAPSHOT_KEY = "ui_ux_upgrade:dashboard_snapshot"
+# The scheduler refreshes the snapshot every minute; keep it a little longer
+# so readers never fall through to computing it themselves
+DASHBOARD_SNAPSHOT_TTL = 5 * 60
+
+# Realtime event carrying metric deltas to subscribed dashboards
+DASHBOARD_UPDATE_EVENT = "ui_ux_dashboard_update"
+
+# Metrics of recent snapshot versions, so clients holding one of them can be
+# sent a delta instead of the full snapshot
+DASHBOARD_HISTORY_KEY = "ui_ux_upgrade:dashboard_history"
+DASHBOARD_HISTORY_SIZE = 10
+
+def compute_dashboard_metrics():
+    """Compute the dashboard metrics, keyed by their `data-metric` name"""
+    update_available = 0
+    if get_cached_release_entry():
+        update_available = int(bool(check_for_upgrades().get("update_available")))
+    
+    return {
+        "active_users": frappe.db.count("User", {"enabled": 1, "user_type": "System User"}),
+        "themes": get_theme_stats()["theme_count"],
+        "pending_suggestions": frappe.db.count("UI Suggestions", {"status": "Pending"}),
+        "update_available": update_available
+    }
+
+def build_snapshot(metrics):
+    """Wrap metrics with a content version so clients can skip unchanged payloads"""
+    payload = json.dumps(metrics, sort_keys=True, default=str)
+    
+    return {
+        "version": hashlib.sha1(payload.encode()).hexdigest()[:12],
+        "generated_at": frappe.utils.now(),
+        "metrics": metrics
+    }
+
+def refresh_dashboard_snapshot():
+    """Recompute the dashboard snapshot and push changes; run by the scheduler"""
+    previous = frappe.cache().get_value(DASHBOARD_SNAPSHOT_KEY)
+    snapshot = build_snapshot(compute_dashboard_metrics())
+    frappe.cache().set_value(DASHBOARD_SNAPSHOT_KEY, snapshot, expires_in_sec=DASHBOARD_SNAPSHOT_TTL)
+    
+    if previous and previous["version"] != snapshot["version"]:
+        remember_snapshot(previous)
+        publish_dashboard_update(previous, snapshot)
+    
+    return snapshot
+
+def remember_snapshot(snapshot):
+    """Keep the metrics of a superseded snapshot for delta responses"""
+    history = frappe.cache().get_value(DASHBOARD_HISTORY_KEY) or {}
+    history.pop(snapshot["version"], None)
+    history[snapshot["version"]] = snapshot["metrics"]
+    
+    # Dicts keep insertion order, so the oldest versions come first
+    for version in list(history)[:-DASHBOARD_HISTORY_SIZE]:
+        del history[version]
+    
+    frappe.cache().set_value(DASHBOARD_HISTORY_KEY, history, expires_in_sec=DASHBOARD_SNAPSHOT_TTL)
+
+def get_dashboard_response(client_version=None):
+    """Get what a client holding `client_version` needs to be current.
+
+    Returns None when the client is already current, a delta of changed
+    metrics when its version is still in the history, or the full snapshot.
+    """
+    snapshot = get_dashboard_snapshot()
+    
+    if client_version == snapshot["version"]:
+        return None
+    
+    if client_version:
+        base_metrics = (frappe.cache().get_value(DASHBOARD_HISTORY_KEY) or {}).get(client_version)
+        if base_metrics is not None:
+            return {
+                "version": snapshot["version"],
+                "base_version": client_version,
+                "delta": get_metrics_delta(base_metrics, snapshot["metrics"])
+            }
+    
+    return snapshot
+
+def get_metrics_delta(previous_metrics, metrics):
+    """Metrics whose value differs from the previous snapshot"""
+    return {key: value for key, value in metrics.items() if previous_metrics.get(key) != value}
+
+def publish_dashboard_update(previous, snapshot):
+    """Broadcast changed metrics to every open dashboard on the site"""
+    frappe.publish_realtime(
+        DASHBOARD_UPDATE_EVENT,
+        {
+            "version": snapshot["version"],
+            "previous_version": previous["version"],
+            "delta": get_metrics_delta(previous["metrics"], snapshot["metrics"])
+        }
+    )
+
+def get_dashboard_snapshot():
+    """Get the current dashboard snapshot, computing it only on a cold cache"""
+    return frappe.cache().get_value(DASHBOARD_SNAPSHOT_KEY) or refresh_dashboard_snapshot()
@@ -0,0 +1,80 @@
+"""
+Overridden desk methods for UI/UX Upgrade
+Serve desk payloads from caches shared by users with the same roles
+"""
+
+import frappe
+import hashlib
+import json
+import time
+from frappe.desk.desktop import get_desktop_page
+from frappe.desk.doctype.dashboard.dashboard import get_permitted_charts
+from ui_ux_upgrade.metrics.chart_rollups import get_chart_rollup
+from ui_ux_upgrade.ui_settings.ui_settings import get_ui_settings
+
+# Desktop payloads, one hash field per workspace/role set/language
+DESKTOP_CACHE_KEY = "ui_ux_upgrade:desktop_pages"
+# Safety net for permission changes that don't go through hooked doctypes
+DESKTOP_CACHE_TTL = 60 * 60
+
+@frappe.whitelist()
+def get_modern_desktop_page(page):
+    """Get a workspace's desktop payload, computed once per role set"""
+    workspace = frappe.parse_json(page)
+    
+    # Private workspaces belong to a single user; nothing to share
+    if not workspace.get("public", 1):
+        return get_modern_payload(get_desktop_page(page))
+    
+    key = get_desktop_cache_field(workspace.get("name"))
+    entry = frappe.cache().hget(DESKTOP_CACHE_KEY, key)
+    
+    # Each entry carries its own age, so one role set missing can't keep
+    # every other entry alive
+    if not entry or time.time() - entry.get("computed_at", 0) > DESKTOP_CACHE_TTL:
+        entry = {
+            "computed_at": time.time(),
+            "payload": get_modern_payload(get_desktop_page(page))
+        }
+        frappe.cache().hset(DESKTOP_CACHE_KEY, key, entry)
+    
+    return entry["payload"]
+
+def get_desktop_cache_field(workspace_name):
+    """Cache field for everything the desktop payload depends on per user"""
+    user = frappe.session.user
+    blocked_modules = [row.module for row in frappe.get_cached_doc("User", user).block_modules]
+    
+    signature = json.dumps([
+        workspace_name,
+        sorted(frappe.get_roles(user)),
+        sorted(blocked_modules),
+        frappe.local.lang
+    ])
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+def get_modern_payload(payload):
+    """Add the modern UI settings to a desktop payload"""
+    payload["modern_ui"] = get_ui_settings()
+    return payload
+
+def clear_desktop_cache(doc=None, method=None):
+    """Drop cached desktop payloads; hooked to Workspace and UI Settings changes"""
+    frappe.cache().delete_value(DESKTOP_CACHE_KEY)
+
+@frappe.whitelist()
+def get_modern_dashboard(dashboard_name):
+    """Get a dashboard's permitted charts with their pre-aggregated series"""
+    charts = []
+    
+    for chart in get_permitted_charts(dashboard_name):
+        charts.append({
+            "chart": chart.chart,
+            "width": chart.width,
+            "data": get_chart_rollup(chart.chart)
+        })
+    
+    return {
+        "name": dashboard_name,
+        "charts": charts
+    }
@@ -0,0 +1 @@
+# Profiler Module
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Request profiler for UI/UX Upgrade
+Samples whitelisted method calls into per-method ring buffers in Redis
+"""
+
+import frappe
+import json
+import random
+import time
+
+# Share of /api/method requests to sample, set with `ui_ux_profiler_sample_rate`
+# in site_config.json (0 disables the profiler)
+SAMPLE_RATE_CONFIG_KEY = "ui_ux_profiler_sample_rate"
+METHOD_PATH_PREFIX = "/api/method/"
+
+PROFILER_METHODS_KEY = "ui_ux_upgrade:profiler:methods"
+PROFILER_SAMPLES_KEY = "ui_ux_upgrade:profiler:samples:{0}"
+PROFILER_RING_SIZE = 500  # samples kept per method
+PROFILER_MAX_METHODS = 200  # methods tracked; samples of further methods are dropped
+
+# Cache reads counted towards the hit rate
+INSTRUMENTED_CACHE_READS = ("get_value", "hget")
+
+_cache_instrumented = False
+
+def start_sample():
+    """Start profiling the current request if it is picked for sampling"""
+    sample_rate = frappe.conf.get(SAMPLE_RATE_CONFIG_KEY)
+    if not sample_rate:
+        return
+    
+    path = frappe.request.path if frappe.request else ""
+    if not path.startswith(METHOD_PATH_PREFIX) or random.random() >= sample_rate:
+        return
+    
+    sample = {
+        "method": path[len(METHOD_PATH_PREFIX):],
+        "started": time.perf_counter(),
+        "queries": 0,
+        "query_time": 0.0,
+        "cache_hits": 0,
+        "cache_misses": 0
+    }
+    frappe.local.ui_ux_profile = sample
+    
+    instrument_db(sample)
+    instrument_cache()
+
+def finish_sample(response=None):
+    """Record the current request's sample, if one was started"""
+    sample = getattr(frappe.local, "ui_ux_profile", None)
+    if not sample:
+        return
+    
+    frappe.local.ui_ux_profile = None
+    # Drop the per-request wrapper installed by instrument_db
+    if frappe.db and "sql" in vars(frappe.db):
+        del frappe.db.sql
+    
+    # Only resolved whitelisted methods get a ring buffer, so unknown paths
+    # can't grow Redis while profiling is on
+    if getattr(response, "status_code", None) == 404 or not is_whitelisted_method(sample["method"]):
+        return
+    
+    methods = {frappe.safe_decode(method) for method in frappe.cache().smembers(PROFILER_METHODS_KEY)}
+    if sample["method"] not in methods and len(methods) >= PROFILER_MAX_METHODS:
+        return
+    
+    record = json.dumps({
+        "timestamp": time.time(),
+        "wall_ms": round((time.perf_counter() - sample["started"]) * 1000, 2),
+        "queries": sample["queries"],
+        "query_ms": round(sample["query_time"] * 1000, 2),
+        "cache_hits": sample["cache_hits"],
+        "cache_misses": sample["cache_misses"],
+        "status": getattr(response, "status_code", None)
+    })
+    
+    key = PROFILER_SAMPLES_KEY.format(sample["method"])
+    frappe.cache().sadd(PROFILER_METHODS_KEY, sample["method"])
+    frappe.cache().lpush(key, record)
+    frappe.cache().ltrim(key, 0, PROFILER_RING_SIZE - 1)
+
+def is_whitelisted_method(method):
+    """Whether a request path names a whitelisted method, after overrides"""
+    overrides = frappe.get_hooks("override_whitelisted_methods") or {}
+    if method in overrides:
+        method = overrides[method][-1]
+    
+    try:
+        return frappe.get_attr(method) in frappe.whitelisted
+    except Exception:
+        return False
+
+def instrument_db(sample):
+    """Count queries of this request by wrapping the request's db connection"""
+    if not frappe.db:
+        return
+    
+    sql = frappe.db.sql
+    
+    def profiled_sql(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return sql(*args, **kwargs)
+        finally:
+            sample["queries"] += 1
+            sample["query_time"] += time.perf_counter() - started
+    
+    # Set on the instance, which only lives for this request
+    frappe.db.sql = profiled_sql
+
+def instrument_cache():
+    """Count cache hits and misses of sampled requests.
+
+    The cache client is shared by the whole process, so it is wrapped once,
+    on the first sampled request, and only counts while a sample is active.
+    """
+    global _cache_instrumented
+    if _cache_instrumented:
+        return
+    
+    cache = frappe.cache()
+    for name in INSTRUMENTED_CACHE_READS:
+        setattr(cache, name, profile_cache_read(getattr(cache, name)))
+    _cache_instrumented = True
+
+def profile_cache_read(read):
+    """Wrap a cache read so a miss (None) or hit is counted on the active sample"""
+    def profiled_read(*args, **kwargs):
+        value = read(*args, **kwargs)
+        sample = getattr(frappe.local, "ui_ux_profile", None)
+        if sample:
+            sample["cache_hits" if value is not None else "cache_misses"] += 1
+        return value
+    
+    return profiled_read
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+@frappe.whitelist()
+def get_profiler_report():
+    """Get latency percentiles, query and cache statistics per sampled method"""
+    frappe.only_for("System Manager")
+    
+    report = []
+    for method in frappe.cache().smembers(PROFILER_METHODS_KEY):
+        method = frappe.safe_decode(method)
+        samples = [
+            json.loads(sample)
+            for sample in frappe.cache().lrange(PROFILER_SAMPLES_KEY.format(method), 0, -1)
+        ]
+        if not samples:
+            continue
+        
+        wall_times = sorted(sample["wall_ms"] for sample in samples)
+        cache_hits = sum(sample["cache_hits"] for sample in samples)
+        cache_lookups = cache_hits + sum(sample["cache_misses"] for sample in samples)
+        
+        report.append({
+            "method": method,
+            "samples": len(samples),
+            "p50_ms": percentile(wall_times, 0.50),
+            "p95_ms": percentile(wall_times, 0.95),
+            "p99_ms": percentile(wall_times, 0.99),
+            "avg_queries": round(sum(sample["queries"] for sample in samples) / len(samples), 2),
+            "avg_query_ms": round(sum(sample["query_ms"] for sample in samples) / len(samples), 2),
+            "cache_hit_rate": round(cache_hits / cache_lookups, 4) if cache_lookups else None
+        })
+    
+    return sorted(report, key=lambda row: row["p95_ms"], reverse=True)
+
+@frappe.whitelist()
+def clear_profiler_samples():
+    """Drop all recorded samples"""
+    frappe.only_for("System Manager")
+    
+    for method in frappe.cache().smembers(PROFILER_METHODS_KEY):
+        frappe.cache().delete_value(PROFILER_SAMPLES_KEY.format(frappe.safe_decode(method)))
+    frappe.cache().delete_value(PROFILER_METHODS_KEY)
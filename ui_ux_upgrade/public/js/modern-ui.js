@@ -3,23 +3,122 @@
  * Enhanced interactions and animations for ERPNext
  */
 
+// Classes added to matching elements as they appear in the page
+const ELEMENT_ENHANCEMENTS = [
+    ['.btn-primary', ['btn-modern', 'btn-modern-primary']],
+    ['.btn-secondary', ['btn-modern', 'btn-modern-secondary']],
+    ['.card', ['modern-card']],
+    ['form', ['form-modern']],
+    ['input[type="text"], input[type="email"], input[type="password"], textarea, select', ['input-modern']],
+    ['table', ['table-modern']]
+];
+
+const ENHANCEMENT_SELECTOR = ELEMENT_ENHANCEMENTS.map(([selector]) => selector).join(', ');
+
+// Feature stylesheets split out of modern-ui.css, loaded the first time an
+// element that needs them shows up, unless the UI Settings flag gating them
+// is switched off
+const CSS_CHUNKS_PATH = '/assets/ui_ux_upgrade/css/chunks/';
+const CSS_CHUNK_TRIGGERS = [
+    ['dashboard', '.dashboard, .dashboard-card', null],
+    ['glassmorphism', '.glassmorphism', 'enable_glassmorphism']
+];
+
+/**
+ * Drives every running animation from a single requestAnimationFrame callback.
+ * Each animation is keyed (usually by its element) so starting a new one for
+ * the same key replaces the running one instead of competing with it.
+ */
+class AnimationScheduler {
+    constructor() {
+        this.animations = new Map();
+        this.frame = null;
+    }
+
+    add(key, duration, step) {
+        this.animations.set(key, { duration, step, start: null });
+        if (!this.frame) {
+            this.frame = requestAnimationFrame((now) => this.tick(now));
+        }
+    }
+
+    tick(now) {
+        this.frame = null;
+
+        this.animations.forEach((animation, key) => {
+            if (animation.start === null) {
+                animation.start = now;
+            }
+
+            const progress = Math.min(1, (now - animation.start) / animation.duration);
+            animation.step(progress);
+
+            if (progress >= 1) {
+                this.animations.delete(key);
+            }
+        });
+
+        if (this.animations.size) {
+            this.frame = requestAnimationFrame((time) => this.tick(time));
+        }
+    }
+}
+
 class ModernUI {
     constructor() {
+        this.animator = new AnimationScheduler();
+        this.reducedMotion = window.matchMedia &&
+            window.matchMedia('(prefers-reduced-motion: reduce)');
         this.init();
     }
 
+    getSetting(name, defaultValue) {
+        // Effective UI Settings, when the server includes them in boot info
+        const settings = (window.frappe && frappe.boot && frappe.boot.ui_ux_settings) || {};
+        return name in settings ? settings[name] : defaultValue;
+    }
+
+    animationsEnabled() {
+        return !!this.getSetting('enable_animations', 1) &&
+            !(this.reducedMotion && this.reducedMotion.matches);
+    }
+
     init() {
+        this.applyFeatureFlags();
         this.setupEventListeners();
         this.applyModernStyles();
         this.initializeAnimations();
         this.setupThemeManager();
+        this.listenForUpgradeNotifications();
+    }
+
+    listenForUpgradeNotifications() {
+        if (!window.frappe || !frappe.realtime) {
+            return;
+        }
+
+        // Published to the rooms of System Managers and users who asked for a check
+        frappe.realtime.on('upgrade_available', (message) => {
+            if (!message || !message.title) {
+                return;
+            }
+            frappe.show_alert({ message: message.message, indicator: message.indicator }, 10);
+        });
+    }
+
+    applyFeatureFlags() {
+        // Neutralise effects switched off in UI Settings before anything renders
+        const root = document.documentElement;
+        root.classList.toggle('ui-ux-no-shadows', !this.getSetting('enable_shadows', 1));
+        root.classList.toggle('ui-ux-no-animations', !this.animationsEnabled());
     }
 
     setupEventListeners() {
         // Modern button interactions
         document.addEventListener('click', (e) => {
-            if (e.target.classList.contains('btn-modern')) {
-                this.addRippleEffect(e);
+            const button = e.target.closest && e.target.closest('.btn-modern');
+            if (button && this.animationsEnabled()) {
+                this.addRippleEffect(e, button);
             }
         });
 
@@ -30,10 +129,25 @@ class ModernUI {
             }
         });
 
-        // Card hover effects
-        document.addEventListener('mouseenter', (e) => {
-            if (e.target.classList.contains('modern-card')) {
-                this.enhanceCardHover(e.target);
+        document.addEventListener('focusout', (e) => {
+            if (e.target.classList.contains('input-modern')) {
+                this.resetInputFocus(e.target);
+            }
+        });
+
+        // Card hover effects (mouseenter/mouseleave don't bubble, so delegate
+        // over/out and ignore moves within the same card)
+        document.addEventListener('mouseover', (e) => {
+            const card = e.target.closest && e.target.closest('.modern-card');
+            if (card && !card.contains(e.relatedTarget) && this.animationsEnabled()) {
+                this.enhanceCardHover(card);
+            }
+        });
+
+        document.addEventListener('mouseout', (e) => {
+            const card = e.target.closest && e.target.closest('.modern-card');
+            if (card && !card.contains(e.relatedTarget)) {
+                this.resetCardHover(card);
             }
         });
 
@@ -50,40 +164,101 @@ class ModernUI {
         // Add modern classes to existing elements
         this.enhanceExistingElements();
         this.setupResponsiveDesign();
-        this.applyCustomThemes();
     }
 
     enhanceExistingElements() {
-        // Enhance buttons
-        document.querySelectorAll('.btn-primary').forEach(btn => {
-            btn.classList.add('btn-modern', 'btn-modern-primary');
-        });
+        // Enhance what is rendered now, then only subtrees added later (route
+        // changes, list refreshes) instead of rescanning the document
+        this.enhanceSubtree(document.body);
+        this.observeNewElements();
+    }
 
-        document.querySelectorAll('.btn-secondary').forEach(btn => {
-            btn.classList.add('btn-modern', 'btn-modern-secondary');
-        });
+    loadStyleChunk(name) {
+        this.loadedChunks = this.loadedChunks || new Set();
+        if (this.loadedChunks.has(name)) {
+            return;
+        }
+        this.loadedChunks.add(name);
+
+        const link = document.createElement('link');
+        link.rel = 'stylesheet';
+        link.href = `${CSS_CHUNKS_PATH}${name}.css`;
+        document.head.appendChild(link);
+    }
 
-        // Enhance cards
-        document.querySelectorAll('.card').forEach(card => {
-            card.classList.add('modern-card');
+    loadStyleChunksFor(root) {
+        CSS_CHUNK_TRIGGERS.forEach(([name, selector, flag]) => {
+            if (flag && !this.getSetting(flag, 1)) {
+                return;
+            }
+            if (!(this.loadedChunks && this.loadedChunks.has(name)) &&
+                (root.matches(selector) || root.querySelector(selector))) {
+                this.loadStyleChunk(name);
+            }
         });
+    }
+
+    enhanceSubtree(root) {
+        this.loadStyleChunksFor(root);
 
-        // Enhance forms
-        document.querySelectorAll('form').forEach(form => {
-            form.classList.add('form-modern');
+        const elements = Array.from(root.querySelectorAll(ENHANCEMENT_SELECTOR));
+        if (root.matches(ENHANCEMENT_SELECTOR)) {
+            elements.push(root);
+        }
+
+        elements.forEach(element => {
+            ELEMENT_ENHANCEMENTS.forEach(([selector, classes]) => {
+                if (element.matches(selector)) {
+                    element.classList.add(...classes);
+                }
+            });
         });
+    }
+
+    observeNewElements() {
+        this.pendingRoots = new Set();
 
-        // Enhance inputs
-        document.querySelectorAll('input[type="text"], input[type="email"], input[type="password"], textarea, select').forEach(input => {
-            input.classList.add('input-modern');
+        this.mutationObserver = new MutationObserver((mutations) => {
+            mutations.forEach(mutation => {
+                mutation.addedNodes.forEach(node => {
+                    if (node.nodeType === Node.ELEMENT_NODE) {
+                        this.pendingRoots.add(node);
+                    }
+                });
+            });
+
+            // Batch everything added before the next frame into one pass
+            if (this.pendingRoots.size && !this.enhanceFrame) {
+                this.enhanceFrame = requestAnimationFrame(() => this.flushPendingEnhancements());
+            }
         });
 
-        // Enhance tables
-        document.querySelectorAll('table').forEach(table => {
-            table.classList.add('table-modern');
+        this.mutationObserver.observe(document.body, { childList: true, subtree: true });
+    }
+
+    flushPendingEnhancements() {
+        const roots = this.pendingRoots;
+        this.pendingRoots = new Set();
+        this.enhanceFrame = null;
+
+        roots.forEach(root => {
+            // Skip nodes removed again, and nodes already covered by an added ancestor
+            if (!root.isConnected || this.hasPendingAncestor(root, roots)) {
+                return;
+            }
+            this.enhanceSubtree(root);
         });
     }
 
+    hasPendingAncestor(node, roots) {
+        for (let parent = node.parentElement; parent; parent = parent.parentElement) {
+            if (roots.has(parent)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
     setupResponsiveDesign() {
         // Mobile menu toggle
         const mobileMenuToggle = document.querySelector('.mobile-menu-toggle');
@@ -109,6 +284,11 @@ class ModernUI {
     }
 
     initializeAnimations() {
+        if (!this.animationsEnabled()) {
+            return;
+        }
+        this.loadStyleChunk('animations');
+
         // Intersection Observer for scroll animations
         const observerOptions = {
             threshold: 0.1,
@@ -131,29 +311,89 @@ class ModernUI {
 
     setupThemeManager() {
         // Theme switching functionality
-        this.loadSavedTheme();
+        this.themeBundles = {};
         this.setupThemeSwitcher();
+        // Boot info carries the active theme's bundle, so the bundle list is
+        // only fetched when a theme without one has to be applied
+        this.loadSavedTheme();
+    }
+
+    loadThemeBundles() {
+        // Compiled Theme Manager bundles, keyed by theme slug; fetched once
+        if (this.themeBundlesRequest) {
+            return this.themeBundlesRequest;
+        }
+        if (!window.frappe || !frappe.call) {
+            return Promise.resolve();
+        }
+
+        this.themeBundlesRequest = frappe.call({
+            method: 'ui_ux_upgrade.theme_manager.theme_compiler.get_theme_bundles'
+        }).then(r => {
+            Object.assign(this.themeBundles, (r && r.message) || {});
+        }).catch(() => {});
+        return this.themeBundlesRequest;
     }
 
     loadSavedTheme() {
-        const savedTheme = localStorage.getItem('modern-ui-theme');
-        if (savedTheme) {
+        // Boot info carries the user's theme on desk; localStorage covers pages without it
+        const bootTheme = this.getSetting('theme', null);
+        const savedTheme = bootTheme || localStorage.getItem('modern-ui-theme');
+        if (!savedTheme) {
+            return;
+        }
+
+        const bootBundle = bootTheme && this.getSetting('theme_bundle', null);
+        if (bootBundle) {
+            this.themeBundles[bootTheme] = bootBundle;
             this.applyTheme(savedTheme);
+            return;
         }
+
+        // Apply built-in variables now, then the compiled bundle if the theme has one
+        this.applyTheme(savedTheme);
+        this.loadThemeBundles().then(() => {
+            if (this.themeBundles[savedTheme]) {
+                this.applyTheme(savedTheme);
+            }
+        });
     }
 
     setupThemeSwitcher() {
         const themeSwitcher = document.querySelector('.theme-switcher');
         if (themeSwitcher) {
             themeSwitcher.addEventListener('change', (e) => {
-                this.applyTheme(e.target.value);
-                localStorage.setItem('modern-ui-theme', e.target.value);
+                const themeName = e.target.value;
+                localStorage.setItem('modern-ui-theme', themeName);
+                this.loadThemeBundles().then(() => {
+                    this.applyTheme(themeName);
+                    this.saveThemePreference(themeName);
+                });
             });
         }
     }
 
+    saveThemePreference(themeName) {
+        if (!window.frappe || !frappe.boot || !frappe.boot.ui_ux_settings) {
+            return;
+        }
+
+        frappe.boot.ui_ux_settings.theme = themeName;
+        frappe.boot.ui_ux_settings.theme_bundle = this.themeBundles[themeName] || null;
+        frappe.call({
+            method: 'ui_ux_upgrade.boot.set_ui_preference',
+            args: { key: 'theme', value: themeName }
+        }).catch(() => {});
+    }
+
     applyTheme(themeName) {
         document.documentElement.setAttribute('data-theme', themeName);
+
+        // Prefer the compiled, cacheable stylesheet for Theme Manager themes
+        if (this.themeBundles && this.themeBundles[themeName]) {
+            this.applyThemeBundle(this.themeBundles[themeName]);
+            return;
+        }
         
         // Apply custom CSS variables based on theme
         const themes = {
@@ -181,8 +421,21 @@ class ModernUI {
         }
     }
 
-    addRippleEffect(event) {
-        const button = event.currentTarget;
+    applyThemeBundle(url) {
+        let link = document.getElementById('modern-ui-theme-bundle');
+        if (!link) {
+            link = document.createElement('link');
+            link.id = 'modern-ui-theme-bundle';
+            link.rel = 'stylesheet';
+            document.head.appendChild(link);
+        }
+
+        if (link.getAttribute('href') !== url) {
+            link.setAttribute('href', url);
+        }
+    }
+
+    addRippleEffect(event, button) {
         const ripple = document.createElement('span');
         const rect = button.getBoundingClientRect();
         const size = Math.max(rect.width, rect.height);
@@ -196,29 +449,32 @@ class ModernUI {
 
         button.appendChild(ripple);
 
-        setTimeout(() => {
-            ripple.remove();
-        }, 600);
+        this.animator.add(ripple, 600, (progress) => {
+            if (progress >= 1) {
+                ripple.remove();
+            }
+        });
     }
 
     enhanceInputFocus(input) {
         input.parentElement.classList.add('input-focused');
-        
-        input.addEventListener('blur', () => {
-            if (!input.value) {
-                input.parentElement.classList.remove('input-focused');
-            }
-        });
+    }
+
+    resetInputFocus(input) {
+        if (!input.value) {
+            input.parentElement.classList.remove('input-focused');
+        }
     }
 
     enhanceCardHover(card) {
         card.style.transform = 'translateY(-4px)';
-        card.style.boxShadow = '0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04)';
-        
-        card.addEventListener('mouseleave', () => {
-            card.style.transform = 'translateY(0)';
-            card.style.boxShadow = '';
-        });
+        // Through the variable so `ui-ux-no-shadows` still applies
+        card.style.boxShadow = 'var(--shadow-xl)';
+    }
+
+    resetCardHover(card) {
+        card.style.transform = 'translateY(0)';
+        card.style.boxShadow = '';
     }
 
     smoothScrollTo(target) {
@@ -269,6 +525,10 @@ class ModernUI {
     }
 
     setupDashboardCards() {
+        if (!this.animationsEnabled()) {
+            return;
+        }
+
         document.querySelectorAll('.dashboard-card').forEach(card => {
             // Add hover effects
             card.addEventListener('mouseenter', () => {
@@ -282,6 +542,10 @@ class ModernUI {
     }
 
     setupCharts() {
+        if (!this.animationsEnabled()) {
+            return;
+        }
+
         // Enhanced chart interactions
         document.querySelectorAll('.chart-container').forEach(chart => {
             chart.addEventListener('mouseenter', () => {
@@ -295,28 +559,106 @@ class ModernUI {
     }
 
     setupRealTimeUpdates() {
-        // Real-time data updates with smooth transitions
-        setInterval(() => {
+        // Real-time data updates with smooth transitions, paused while the
+        // tab is hidden
+        this.onDashboardUpdate = (message) => this.applyDashboardUpdate(message);
+        this.startDashboardUpdates();
+
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                this.stopDashboardUpdates();
+            } else {
+                this.startDashboardUpdates();
+            }
+        });
+    }
+
+    hasRealtime() {
+        return !!(window.frappe && frappe.realtime && frappe.realtime.on);
+    }
+
+    startDashboardUpdates() {
+        if (this.dashboardUpdatesActive) {
+            return;
+        }
+        this.dashboardUpdatesActive = true;
+
+        // Catch up on anything missed while stopped, then follow the server's
+        // change feed
+        this.updateDashboardData();
+
+        if (this.hasRealtime()) {
+            frappe.realtime.on('ui_ux_dashboard_update', this.onDashboardUpdate);
+        } else {
+            // No socket available: fall back to polling
+            this.dashboardTimer = setInterval(() => {
+                this.updateDashboardData();
+            }, 30000); // Update every 30 seconds
+        }
+    }
+
+    stopDashboardUpdates() {
+        this.dashboardUpdatesActive = false;
+
+        if (this.hasRealtime() && frappe.realtime.off) {
+            frappe.realtime.off('ui_ux_dashboard_update', this.onDashboardUpdate);
+        }
+        clearInterval(this.dashboardTimer);
+        this.dashboardTimer = null;
+    }
+
+    applyDashboardUpdate(message) {
+        // A delta only applies on top of the snapshot it was computed from
+        if (!message || message.previous_version !== this.dashboardVersion) {
             this.updateDashboardData();
-        }, 30000); // Update every 30 seconds
+            return;
+        }
+
+        this.dashboardVersion = message.version;
+        this.animateValueChanges(message.delta || {});
     }
 
     updateDashboardData() {
-        // Fetch and update dashboard data with animations
-        fetch('/api/method/ui_ux_upgrade.api.get_dashboard_data')
-            .then(response => response.json())
+        // Fetch and update dashboard data with animations; sending the last
+        // seen version gets a 304 or just the changed metrics back
+        const headers = this.dashboardVersion ? { 'If-None-Match': `"${this.dashboardVersion}"` } : {};
+
+        fetch('/api/method/ui_ux_upgrade.api.get_dashboard_data', { headers })
+            .then(response => response.status === 304 ? null : response.json())
             .then(data => {
-                this.animateValueChanges(data);
+                const payload = data && data.message;
+                if (!payload) {
+                    return;
+                }
+
+                if (payload.delta && payload.base_version === this.dashboardVersion) {
+                    this.animateValueChanges(payload.delta);
+                } else if (payload.metrics) {
+                    this.animateValueChanges(payload.metrics);
+                }
+                this.dashboardVersion = payload.version;
             })
             .catch(error => {
                 console.error('Error updating dashboard:', error);
             });
     }
 
+    getMetricElement(key) {
+        // Cache metric elements between updates; re-query if one was re-rendered
+        this.metricElements = this.metricElements || new Map();
+
+        let element = this.metricElements.get(key);
+        if (!element || !element.isConnected) {
+            element = document.querySelector(`[data-metric="${key}"]`);
+            this.metricElements.set(key, element);
+        }
+        return element;
+    }
+
     animateValueChanges(data) {
         // Animate value changes in dashboard cards
         Object.entries(data).forEach(([key, value]) => {
-            const element = document.querySelector(`[data-metric="${key}"]`);
+            const element = this.getMetricElement(key);
             if (element) {
                 this.animateNumber(element, value);
             }
@@ -324,20 +666,18 @@ class ModernUI {
     }
 
     animateNumber(element, targetValue) {
-        const currentValue = parseInt(element.textContent) || 0;
-        const increment = (targetValue - currentValue) / 30;
-        let current = currentValue;
-        
-        const timer = setInterval(() => {
-            current += increment;
-            if ((increment > 0 && current >= targetValue) || 
-                (increment < 0 && current <= targetValue)) {
-                element.textContent = targetValue;
-                clearInterval(timer);
-            } else {
-                element.textContent = Math.round(current);
-            }
-        }, 50);
+        if (!this.animationsEnabled()) {
+            element.textContent = targetValue;
+            return;
+        }
+
+        const startValue = parseInt(element.textContent) || 0;
+
+        this.animator.add(element, 1500, (progress) => {
+            element.textContent = progress >= 1
+                ? targetValue
+                : Math.round(startValue + (targetValue - startValue) * progress);
+        });
     }
 }
 
@@ -0,0 +1,64 @@
+/**
+ * Request Profiler page
+ * Latency percentiles per whitelisted method, from sampled requests
+ */
+
+frappe.pages['ui-ux-profiler'].on_page_load = function(wrapper) {
+    const page = frappe.ui.make_app_page({
+        parent: wrapper,
+        title: __('Request Profiler'),
+        single_column: true
+    });
+
+    const $report = $('<div class="profiler-report"></div>').appendTo(page.main);
+
+    const render = () => {
+        frappe.call('ui_ux_upgrade.profiler.request_profiler.get_profiler_report').then(r => {
+            const rows = r.message || [];
+
+            if (!rows.length) {
+                $report.html(`<p class="text-muted">${__('No samples yet. Set ui_ux_profiler_sample_rate in site_config.json to start sampling.')}</p>`);
+                return;
+            }
+
+            const format = value => value === null || value === undefined ? '-' : value;
+            const body = rows.map(row => `
+                <tr>
+                    <td>${frappe.utils.escape_html(row.method)}</td>
+                    <td class="text-right">${row.samples}</td>
+                    <td class="text-right">${format(row.p50_ms)}</td>
+                    <td class="text-right">${format(row.p95_ms)}</td>
+                    <td class="text-right">${format(row.p99_ms)}</td>
+                    <td class="text-right">${row.avg_queries}</td>
+                    <td class="text-right">${row.avg_query_ms}</td>
+                    <td class="text-right">${row.cache_hit_rate === null ? '-' : (row.cache_hit_rate * 100).toFixed(1) + '%'}</td>
+                </tr>
+            `).join('');
+
+            $report.html(`
+                <table class="table table-bordered table-modern">
+                    <thead>
+                        <tr>
+                            <th>${__('Method')}</th>
+                            <th class="text-right">${__('Samples')}</th>
+                            <th class="text-right">${__('p50 (ms)')}</th>
+                            <th class="text-right">${__('p95 (ms)')}</th>
+                            <th class="text-right">${__('p99 (ms)')}</th>
+                            <th class="text-right">${__('Queries')}</th>
+                            <th class="text-right">${__('Query Time (ms)')}</th>
+                            <th class="text-right">${__('Cache Hit Rate')}</th>
+                        </tr>
+                    </thead>
+                    <tbody>${body}</tbody>
+                </table>
+            `);
+        });
+    };
+
+    page.set_primary_action(__('Refresh'), render);
+    page.set_secondary_action(__('Clear Samples'), () => {
+        frappe.call('ui_ux_upgrade.profiler.request_profiler.clear_profiler_samples').then(render);
+    });
+
+    render();
+};
@@ -5,38 +5,42 @@ Analyzes current setup and provides improvement recommendations
 
 import frappe
 from frappe import _
+from frappe.translate import get_all_translations
+import hashlib
 import json
+import queue
+import threading
+import time
+from ui_ux_upgrade.theme_manager.theme_stats import get_theme_stats
+from ui_ux_upgrade.ui_settings.ui_settings import get_ui_settings
+
+# Computed suggestion sets, one hash field per language
+SUGGESTIONS_CACHE_KEY = "ui_ux_upgrade:suggestions"
+# Sets missing an analyzer that timed out or failed, per language; kept
+# briefly so the analyzer is retried soon without rerunning on every request
+PARTIAL_SUGGESTIONS_CACHE_KEY = "ui_ux_upgrade:partial_suggestions"
+PARTIAL_SUGGESTIONS_CACHE_TTL = 60
+
+# Analyzers are registered through the `ui_ux_suggestion_analyzers` hook; each
+# takes the current UI settings and returns a list of suggestions. A suggestion's
+# untranslated `id` keeps its record stable across languages and runs
+ANALYZERS_HOOK = "ui_ux_suggestion_analyzers"
+ANALYZER_TIMEOUT = 5  # seconds, override with `ui_ux_upgrade_analyzer_timeout`
+MAX_ANALYZER_WORKERS = 4
 
 @frappe.whitelist()
 def get_ui_suggestions():
     """Get UI/UX improvement suggestions based on current configuration"""
     try:
-        suggestions = []
-        
-        # Check current UI settings
-        ui_settings = get_current_ui_settings()
-        
-        # Analyze theme configuration
-        theme_suggestions = analyze_theme_configuration()
-        suggestions.extend(theme_suggestions)
-        
-        # Analyze performance settings
-        performance_suggestions = analyze_performance_settings(ui_settings)
-        suggestions.extend(performance_suggestions)
-        
-        # Analyze accessibility
-        accessibility_suggestions = analyze_accessibility_settings(ui_settings)
-        suggestions.extend(accessibility_suggestions)
-        
-        # Analyze user experience
-        ux_suggestions = analyze_user_experience()
-        suggestions.extend(ux_suggestions)
+        suggestion_set = get_suggestion_set()
+        suggestions = suggestion_set["suggestions"]
         
         return {
             "success": True,
             "suggestions": suggestions,
             "total_suggestions": len(suggestions),
-            "categories": categorize_suggestions(suggestions)
+            "categories": suggestion_set["categories"],
+            "timings": suggestion_set.get("timings", {})
         }
         
     except Exception as e:
@@ -46,43 +50,183 @@ def get_ui_suggestions():
             "message": _("Failed to generate suggestions: {0}").format(str(e))
         }
 
-def get_current_ui_settings():
-    """Get current UI settings configuration"""
-    try:
-        # Try to get UI Settings record
-        ui_settings = frappe.get_all(
-            "UI Settings",
-            fields=["enable_animations", "modern_theme", "enable_glassmorphism", "enable_shadows"],
-            limit=1
-        )
-        
-        if ui_settings:
-            return ui_settings[0]
+def get_suggestion_set():
+    """Get the computed suggestion set for this site, building it on a cache miss"""
+    # Suggestions hold translated text, so cache them per language
+    lang = frappe.local.lang or "en"
+    partial_cache_key = f"{PARTIAL_SUGGESTIONS_CACHE_KEY}:{lang}"
+    suggestion_set = frappe.cache().hget(SUGGESTIONS_CACHE_KEY, lang)
+    
+    if suggestion_set is None:
+        suggestion_set = frappe.cache().get_value(partial_cache_key)
+    
+    if suggestion_set is None:
+        suggestions, timings = build_suggestions()
+        suggestion_set = build_suggestion_set(suggestions)
+    
+        if all(timing["status"] == "ok" for timing in timings.values()):
+            frappe.cache().hset(SUGGESTIONS_CACHE_KEY, lang, suggestion_set)
         else:
-            return {
-                "enable_animations": 1,
-                "modern_theme": "Default",
-                "enable_glassmorphism": 1,
-                "enable_shadows": 1
-            }
-    except:
-        return {
-            "enable_animations": 1,
-            "modern_theme": "Default", 
-            "enable_glassmorphism": 1,
-            "enable_shadows": 1
+            frappe.cache().set_value(
+                partial_cache_key, suggestion_set, expires_in_sec=PARTIAL_SUGGESTIONS_CACHE_TTL
+            )
+    else:
+        # Served from the cache, so no analyzer ran for this request
+        timings = {}
+    
+    suggestion_set["timings"] = timings
+    return suggestion_set
+
+def get_analyzers():
+    """Get registered analyzer method paths, in hook order"""
+    return frappe.get_hooks(ANALYZERS_HOOK) or []
+
+def without_db(analyzer):
+    """Mark an analyzer that never queries the database, so it runs without a connection"""
+    analyzer.uses_db = False
+    return analyzer
+
+def build_suggestions():
+    """Run all registered analyzers against the current configuration.
+
+    Up to MAX_ANALYZER_WORKERS analyzers run at a time, each in its own site
+    context. Each gets the full timeout from when it starts; one that
+    overruns is left out of the result and its slot goes to the next one.
+    Returns the suggestions and a per-analyzer timing breakdown.
+    """
+    ui_settings = get_current_ui_settings()
+    analyzers = list(dict.fromkeys(get_analyzers()))
+    timeout = frappe.conf.get("ui_ux_upgrade_analyzer_timeout") or ANALYZER_TIMEOUT
+    site, sites_path, lang = frappe.local.site, frappe.local.sites_path, frappe.local.lang
+    
+    # Analyzers without a connection still translate; load the translations
+    # into the cache here so their threads don't need the database for it
+    if lang:
+        get_all_translations(lang)
+    
+    suggestions_by_analyzer = {}
+    timings = {}
+    results = queue.Queue()
+    pending = list(analyzers)
+    running = {}  # analyzer -> deadline
+    
+    while pending or running:
+        while pending and len(running) < MAX_ANALYZER_WORKERS:
+            analyzer = pending.pop(0)
+            running[analyzer] = time.monotonic() + timeout
+            threading.Thread(
+                target=run_analyzer,
+                args=(results, site, sites_path, lang, analyzer, ui_settings),
+                daemon=True
+            ).start()
+        
+        try:
+            analyzer, analyzer_suggestions, duration, error = results.get(
+                timeout=max(0, min(running.values()) - time.monotonic())
+            )
+        except queue.Empty:
+            # Don't hold the request on analyzers that overran; their threads
+            # finish in the background and their results are ignored
+            now = time.monotonic()
+            for analyzer, deadline in list(running.items()):
+                if deadline <= now:
+                    del running[analyzer]
+                    frappe.log_error(f"Analyzer {analyzer} timed out after {timeout}s", "UI/UX Suggestions")
+                    timings[analyzer] = {"status": "timeout", "duration_ms": timeout * 1000, "count": 0}
+            continue
+        
+        if analyzer not in running:
+            continue
+        del running[analyzer]
+        
+        if error:
+            frappe.log_error(f"Analyzer {analyzer} failed: {error}", "UI/UX Suggestions")
+        
+        for suggestion in analyzer_suggestions:
+            # Analyzers without ids fall back to the (translated) title
+            suggestion.setdefault("key", f"{analyzer}:{suggestion.get('id') or suggestion.get('title')}")
+        
+        suggestions_by_analyzer[analyzer] = analyzer_suggestions
+        timings[analyzer] = {
+            "status": "error" if error else "ok",
+            "duration_ms": round(duration * 1000, 2),
+            "count": len(analyzer_suggestions)
         }
+    
+    # Keep hook order regardless of which analyzer finished first
+    suggestions = [
+        suggestion
+        for analyzer in analyzers
+        for suggestion in suggestions_by_analyzer.get(analyzer, [])
+    ]
+    return suggestions, timings
+
+def run_analyzer(results, site, sites_path, lang, analyzer, ui_settings):
+    """Run one analyzer in a worker thread with its own site context.
+
+    A database connection is only opened for analyzers not marked with
+    `without_db`.
+    """
+    started = time.monotonic()
+    frappe.init(site=site, sites_path=sites_path)
+    
+    try:
+        frappe.local.lang = lang
+        method = frappe.get_attr(analyzer)
+        if getattr(method, "uses_db", True):
+            frappe.connect()
+        analyzer_suggestions, error = method(ui_settings) or [], None
+    except Exception as e:
+        analyzer_suggestions, error = [], str(e)
+    finally:
+        frappe.destroy()
+    
+    results.put((analyzer, analyzer_suggestions, time.monotonic() - started, error))
+
+def build_suggestion_set(suggestions):
+    """Bundle suggestions with category and priority indexes for filtering"""
+    by_category = {}
+    by_priority = {}
+    
+    for index, suggestion in enumerate(suggestions):
+        by_category.setdefault(suggestion.get("category", "General"), []).append(index)
+        by_priority.setdefault(suggestion.get("priority", "medium"), []).append(index)
+    
+    return {
+        "suggestions": suggestions,
+        "categories": categorize_suggestions(suggestions),
+        "by_category": by_category,
+        "by_priority": by_priority
+    }
+
+def clear_suggestions_cache(doc=None, method=None):
+    """Drop cached suggestions; hooked to UI Settings and Theme Manager changes"""
+    def invalidate():
+        frappe.cache().delete_value(SUGGESTIONS_CACHE_KEY)
+        frappe.cache().delete_keys(PARTIAL_SUGGESTIONS_CACHE_KEY)
+    
+    invalidate()
+    if doc:
+        # Drop it again once the change is committed, in case another request
+        # rebuilt it from pre-commit data in the meantime
+        frappe.db.after_commit.add(invalidate)
+
+def get_current_ui_settings():
+    """Get current UI settings configuration"""
+    return get_ui_settings()
 
-def analyze_theme_configuration():
+def analyze_theme_configuration(ui_settings=None):
     """Analyze theme setup and provide suggestions"""
     suggestions = []
     
     try:
         # Check number of custom themes
-        theme_count = frappe.db.count("Theme Manager")
+        theme_stats = get_theme_stats()
+        theme_count = theme_stats["theme_count"]
         
         if theme_count == 0:
             suggestions.append({
+                "id": "create_custom_themes",
                 "category": "Theme",
                 "priority": "high",
                 "title": _("Create Custom Themes"),
@@ -92,6 +236,7 @@ def analyze_theme_configuration():
             })
         elif theme_count < 3:
             suggestions.append({
+                "id": "expand_theme_options",
                 "category": "Theme",
                 "priority": "medium",
                 "title": _("Expand Theme Options"),
@@ -101,10 +246,11 @@ def analyze_theme_configuration():
             })
         
         # Check for custom CSS usage
-        themes_with_css = frappe.db.count("Theme Manager", {"css_code": ["!=", ""]})
+        themes_with_css = theme_stats["themes_with_css"]
         
         if themes_with_css == 0 and theme_count > 0:
             suggestions.append({
+                "id": "add_custom_css",
                 "category": "Theme",
                 "priority": "low",
                 "title": _("Add Custom CSS"),
@@ -118,6 +264,7 @@ def analyze_theme_configuration():
     
     return suggestions
 
+@without_db
 def analyze_performance_settings(ui_settings):
     """Analyze performance-related settings"""
     suggestions = []
@@ -126,6 +273,7 @@ def analyze_performance_settings(ui_settings):
         # Check if animations are enabled on slower devices
         if ui_settings.get("enable_animations"):
             suggestions.append({
+                "id": "reduce_animations",
                 "category": "Performance",
                 "priority": "low",
                 "title": _("Consider Reducing Animations"),
@@ -137,6 +285,7 @@ def analyze_performance_settings(ui_settings):
         # Check if glassmorphism is enabled (can be performance intensive)
         if ui_settings.get("enable_glassmorphism"):
             suggestions.append({
+                "id": "monitor_glassmorphism",
                 "category": "Performance",
                 "priority": "medium",
                 "title": _("Monitor Glassmorphism Performance"),
@@ -150,6 +299,7 @@ def analyze_performance_settings(ui_settings):
     
     return suggestions
 
+@without_db
 def analyze_accessibility_settings(ui_settings):
     """Analyze accessibility configurations"""
     suggestions = []
@@ -158,6 +308,7 @@ def analyze_accessibility_settings(ui_settings):
         # Suggest high contrast theme
         if ui_settings.get("modern_theme") not in ["High Contrast", "Accessible"]:
             suggestions.append({
+                "id": "high_contrast_theme",
                 "category": "Accessibility",
                 "priority": "high",
                 "title": _("Create High Contrast Theme"),
@@ -169,6 +320,7 @@ def analyze_accessibility_settings(ui_settings):
         # Check shadow settings for accessibility
         if ui_settings.get("enable_shadows"):
             suggestions.append({
+                "id": "reduced_motion_option",
                 "category": "Accessibility",
                 "priority": "medium",
                 "title": _("Consider Reduced Motion Option"),
@@ -182,13 +334,15 @@ def analyze_accessibility_settings(ui_settings):
     
     return suggestions
 
-def analyze_user_experience():
+@without_db
+def analyze_user_experience(ui_settings=None):
     """Analyze overall user experience factors"""
     suggestions = []
     
     try:
         # Check for user feedback or usage patterns
         suggestions.append({
+            "id": "collect_user_feedback",
             "category": "User Experience",
             "priority": "medium",
             "title": _("Collect User Feedback"),
@@ -199,6 +353,7 @@ def analyze_user_experience():
         
         # Suggest mobile optimization
         suggestions.append({
+            "id": "optimize_for_mobile",
             "category": "User Experience",
             "priority": "high",
             "title": _("Optimize for Mobile"),
@@ -209,6 +364,7 @@ def analyze_user_experience():
         
         # Suggest user onboarding
         suggestions.append({
+            "id": "user_onboarding",
             "category": "User Experience",
             "priority": "medium",
             "title": _("Create User Onboarding"),
@@ -240,6 +396,86 @@ def categorize_suggestions(suggestions):
     
     return categories
 
+def get_suggestion_key(suggestion):
+    """Analyzer-qualified key of a suggestion, set by build_suggestions"""
+    return suggestion.get("key") or f"{suggestion.get('category')}:{suggestion.get('title')}"
+
+def get_suggestion_hash(key):
+    """Hash of a suggestion's analyzer-qualified key, stored on its record"""
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def sync_suggestion_records(suggestions):
+    """Upsert UI Suggestions records for a suggestion list in bulk.
+
+    Suggestions are matched to records by the hash of their untranslated
+    key, so runs in other languages don't re-create them. Existing pending
+    records get their priority refreshed; new suggestions are written with
+    one multi-row insert. Records created by hand are never touched.
+    """
+    hashes = {get_suggestion_hash(get_suggestion_key(suggestion)) for suggestion in suggestions}
+    existing = {}
+    if hashes:
+        for row in frappe.get_all(
+            "UI Suggestions",
+            filters={"suggestion_hash": ["in", list(hashes)]},
+            fields=["name", "suggestion_hash", "priority", "status"],
+            order_by="creation asc"
+        ):
+            existing.setdefault(row.suggestion_hash, row)
+    
+    now = frappe.utils.now()
+    seen = set()
+    priority_updates = {}
+    rows = []
+    created = []
+    
+    for suggestion in suggestions:
+        suggestion_hash = get_suggestion_hash(get_suggestion_key(suggestion))
+        if suggestion_hash in seen:
+            continue
+        seen.add(suggestion_hash)
+        
+        priority = suggestion.get("priority").title()
+        record = existing.get(suggestion_hash)
+        
+        if record:
+            if record.status == "Pending" and record.priority != priority:
+                priority_updates.setdefault(priority, []).append(record.name)
+            continue
+        
+        name = frappe.generate_hash(length=10)
+        created.append(name)
+        rows.append((
+            name, now, now, frappe.session.user, frappe.session.user, 0,
+            suggestion.get("category"),
+            priority,
+            suggestion.get("title"),
+            suggestion.get("description"),
+            suggestion.get("action"),
+            suggestion.get("icon"),
+            "Pending",
+            suggestion_hash
+        ))
+    
+    if rows:
+        frappe.db.bulk_insert(
+            "UI Suggestions",
+            fields=[
+                "name", "creation", "modified", "owner", "modified_by", "docstatus",
+                "category", "priority", "title", "description", "action", "icon", "status",
+                "suggestion_hash"
+            ],
+            values=rows
+        )
+    
+    for priority, names in priority_updates.items():
+        frappe.db.set_value("UI Suggestions", {"name": ["in", names]}, "priority", priority)
+    
+    return {
+        "created": created,
+        "updated": sum(len(names) for names in priority_updates.values())
+    }
+
 @frappe.whitelist()
 def mark_suggestion_completed(suggestion_id):
     """Mark a suggestion as completed"""
@@ -259,21 +495,28 @@ def mark_suggestion_completed(suggestion_id):
 @frappe.whitelist()
 def get_suggestion_details(category=None, priority=None):
     """Get detailed suggestions filtered by category and priority"""
-    suggestions = get_ui_suggestions()
-    
-    if not suggestions.get("success"):
-        return suggestions
+    try:
+        suggestion_set = get_suggestion_set()
+    except Exception as e:
+        frappe.log_error(f"Suggestions generation failed: {str(e)}", "UI/UX Suggestions")
+        return {
+            "success": False,
+            "message": _("Failed to generate suggestions: {0}").format(str(e))
+        }
     
-    filtered_suggestions = suggestions["suggestions"]
+    indexes = range(len(suggestion_set["suggestions"]))
     
     if category:
-        filtered_suggestions = [s for s in filtered_suggestions if s.get("category") == category]
+        indexes = suggestion_set["by_category"].get(category, [])
     
     if priority:
-        filtered_suggestions = [s for s in filtered_suggestions if s.get("priority") == priority]
+        priority_indexes = set(suggestion_set["by_priority"].get(priority, []))
+        indexes = [i for i in indexes if i in priority_indexes]
+    
+    filtered_suggestions = [suggestion_set["suggestions"][i] for i in indexes]
     
     return {
         "success": True,
         "suggestions": filtered_suggestions,
         "total": len(filtered_suggestions)
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,125 @@
+"""
+Scheduled tasks for UI/UX Upgrade
+Prunes app data and rebuilds caches
+"""
+
+import frappe
+import json
+from frappe.utils import add_days, now_datetime
+from ui_ux_upgrade.overrides import get_modern_desktop_page
+from ui_ux_upgrade.suggestions.suggestions import get_suggestion_set
+from ui_ux_upgrade.theme_manager.theme_compiler import build_all_theme_bundles
+
+# Rows older than this many days are pruned; override in site_config.json
+UPGRADE_CHECK_RETENTION_DAYS = 30  # `ui_ux_upgrade_check_retention_days`
+SUGGESTION_RETENTION_DAYS = 90  # `ui_ux_suggestion_retention_days`
+
+# Rows deleted per statement; each chunk is committed so no lock is held long
+DELETE_CHUNK_SIZE = 500
+
+# UI Settings is a single document stored in tabSingles, so it has no table
+APP_TABLES = ("Theme Manager", "Upgrade Check", "UI Suggestions")
+
+def daily_cleanup():
+    """Prune old Upgrade Check rows and closed, manually created UI Suggestions"""
+    check_cutoff = add_days(
+        now_datetime(),
+        -(frappe.conf.get("ui_ux_upgrade_check_retention_days") or UPGRADE_CHECK_RETENTION_DAYS)
+    )
+    suggestion_cutoff = add_days(
+        now_datetime(),
+        -(frappe.conf.get("ui_ux_suggestion_retention_days") or SUGGESTION_RETENTION_DAYS)
+    )
+    
+    # Always keep the most recent check, however old it is
+    latest_check = frappe.get_all("Upgrade Check", order_by="creation desc", limit=1, pluck="name")
+    check_filters = {"creation": ["<", check_cutoff]}
+    if latest_check:
+        check_filters["name"] = ["!=", latest_check[0]]
+    
+    deleted_checks = delete_in_chunks("Upgrade Check", check_filters)
+    # Synced suggestions are kept: their suggestion_hash is what stops
+    # sync_suggestion_records from creating a dismissed suggestion again
+    deleted_suggestions = delete_in_chunks("UI Suggestions", {
+        "status": ["in", ["Dismissed", "Completed"]],
+        "modified": ["<", suggestion_cutoff],
+        "suggestion_hash": ["is", "not set"]
+    })
+    
+    return {
+        "upgrade_checks": deleted_checks,
+        "suggestions": deleted_suggestions
+    }
+
+def delete_in_chunks(doctype, filters, chunk_size=DELETE_CHUNK_SIZE):
+    """Delete matching rows in small committed batches"""
+    deleted = 0
+    
+    while True:
+        names = frappe.get_all(doctype, filters=filters, pluck="name", limit=chunk_size)
+        if not names:
+            break
+        
+        frappe.db.delete(doctype, {"name": ["in", names]})
+        frappe.db.commit()
+        deleted += len(names)
+    
+    return deleted
+
+def weekly_optimization():
+    """Rebuild theme bundles, warm caches and report app table sizes"""
+    report = {
+        "theme_bundles": len(build_all_theme_bundles()),
+        "suggestions": len(get_suggestion_set()["suggestions"]),
+        "desktop_pages": warm_desktop_cache(),
+        "tables": get_table_sizes()
+    }
+    
+    frappe.logger("ui_ux_upgrade").info(f"Weekly optimization: {json.dumps(report, default=str)}")
+    return report
+
+def warm_desktop_cache():
+    """Precompute public workspace payloads for every distinct role set"""
+    representatives = {}
+    for user in frappe.get_all("User", filters={"enabled": 1, "user_type": "System User"}, pluck="name"):
+        representatives.setdefault(tuple(sorted(frappe.get_roles(user))), user)
+    
+    workspaces = frappe.get_all("Workspace", filters={"public": 1}, fields=["name", "title"])
+    original_user = frappe.session.user
+    warmed = 0
+    
+    try:
+        for user in representatives.values():
+            frappe.set_user(user)
+            for workspace in workspaces:
+                try:
+                    get_modern_desktop_page(json.dumps({
+                        "name": workspace.name,
+                        "title": workspace.title,
+                        "public": 1
+                    }))
+                    warmed += 1
+                except frappe.PermissionError:
+                    # Not every role set can open every workspace
+                    pass
+    finally:
+        frappe.set_user(original_user)
+    
+    return warmed
+
+def get_table_sizes():
+    """Row counts, plus on-disk size on MariaDB, of the app's tables"""
+    if frappe.db.db_type == "mariadb":
+        rows = frappe.db.sql("""
+            select table_name as `table`, table_rows as `rows`,
+                data_length + index_length as `bytes`
+            from information_schema.tables
+            where table_schema = database() and table_name in %(tables)s
+        """, {"tables": [f"tab{doctype}" for doctype in APP_TABLES]}, as_dict=True)
+        return {row.table: {"rows": row.rows, "bytes": row.bytes} for row in rows}
+    
+    return {
+        f"tab{doctype}": {"rows": frappe.db.count(doctype)}
+        for doctype in APP_TABLES
+        if frappe.db.table_exists(doctype)
+    }
@@ -0,0 +1 @@
+# Theme Manager Module
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Theme compiler for UI/UX Upgrade
+Renders Theme Manager records into minified, content-hashed CSS bundles
+"""
+
+import frappe
+import glob
+import hashlib
+import os
+from ui_ux_upgrade.css_build import minify_css
+
+# Bundles live in the site's public files so they are served as static assets;
+# the content hash in the file name makes them safe to cache indefinitely
+BUNDLE_FOLDER = "ui_ux_themes"
+BUNDLE_CACHE_KEY = "ui_ux_upgrade:theme_bundles"
+BUNDLE_BUILD_JOB_ID = "ui_ux_upgrade_theme_bundles"
+
+def get_theme_slug(theme_name):
+    """Slug used for the bundle file name and the `data-theme` attribute"""
+    return frappe.scrub(theme_name).replace("_", "-")
+
+def render_theme_css(theme):
+    """Render a Theme Manager record into CSS.
+
+    Only the generated variable block is minified: the regex minifier would
+    rewrite quoted strings, `url()`s and attribute selectors in user CSS, so
+    `css_code` is appended as written.
+    """
+    variables = []
+    
+    if theme.get("primary_color"):
+        variables.append(f"--primary-color: {theme.primary_color};")
+    if theme.get("secondary_color"):
+        variables.append(f"--secondary-color: {theme.secondary_color};")
+    
+    css = minify_css(':root[data-theme="{0}"] {{\n    {1}\n}}\n'.format(
+        get_theme_slug(theme.theme_name), "\n    ".join(variables)
+    ))
+    
+    if theme.get("css_code"):
+        css += "\n" + theme.css_code
+    
+    return css
+
+def get_bundle_path(file_name=""):
+    """Absolute path inside the site's theme bundle folder"""
+    return frappe.get_site_path("public", "files", BUNDLE_FOLDER, file_name)
+
+def build_theme_bundle(theme):
+    """Compile a theme into its bundle, writing a file only when the content changed"""
+    slug = get_theme_slug(theme.theme_name)
+    css = render_theme_css(theme)
+    content_hash = hashlib.sha256(css.encode()).hexdigest()[:12]
+    file_name = f"{slug}.{content_hash}.css"
+    path = get_bundle_path(file_name)
+    
+    if not os.path.exists(path):
+        os.makedirs(get_bundle_path(), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(css)
+        remove_theme_bundles(slug, keep=file_name)
+    
+    url = f"/files/{BUNDLE_FOLDER}/{file_name}"
+    frappe.cache().hset(BUNDLE_CACHE_KEY, slug, url)
+    return url
+
+def remove_theme_bundles(slug, keep=None):
+    """Delete compiled bundles of a theme, except the one named `keep`"""
+    for path in glob.glob(get_bundle_path(f"{slug}.*.css")):
+        if os.path.basename(path) != keep:
+            os.remove(path)
+
+def build_all_theme_bundles():
+    """Compile every Theme Manager record and rebuild the bundle map"""
+    frappe.cache().delete_value(BUNDLE_CACHE_KEY)
+    
+    themes = frappe.get_all(
+        "Theme Manager",
+        fields=["theme_name", "primary_color", "secondary_color", "css_code"]
+    )
+    return {get_theme_slug(theme.theme_name): build_theme_bundle(theme) for theme in themes}
+
+@frappe.whitelist()
+def get_theme_bundles():
+    """Get the bundle URL of every theme, keyed by theme slug.
+
+    Never compiles: on a cold cache the bundles already on disk are listed
+    and a background job rebuilds the map and any missing bundles.
+    """
+    bundles = frappe.cache().hgetall(BUNDLE_CACHE_KEY)
+    
+    if not bundles:
+        bundles = get_bundle_files()
+        frappe.enqueue(
+            "ui_ux_upgrade.theme_manager.theme_compiler.build_all_theme_bundles",
+            queue="short",
+            job_id=BUNDLE_BUILD_JOB_ID,
+            deduplicate=True,
+        )
+    
+    return {frappe.safe_decode(slug): url for slug, url in bundles.items()}
+
+def get_bundle_files():
+    """Bundle URLs of the compiled files on disk, keyed by theme slug"""
+    bundles = {}
+    for path in glob.glob(get_bundle_path("*.css")):
+        file_name = os.path.basename(path)
+        bundles[file_name.rsplit(".", 2)[0]] = f"/files/{BUNDLE_FOLDER}/{file_name}"
+    return bundles
+
+def on_theme_update(doc, method=None):
+    """Rebuild the bundle of a saved theme"""
+    previous = doc.get_doc_before_save()
+    if previous and previous.theme_name != doc.theme_name:
+        on_theme_trash(previous)
+    
+    build_theme_bundle(doc)
+
+def on_theme_trash(doc, method=None):
+    """Remove the bundle of a deleted theme"""
+    slug = get_theme_slug(doc.theme_name)
+    remove_theme_bundles(slug)
+    frappe.cache().hdel(BUNDLE_CACHE_KEY, slug)
@@ -0,0 +1,53 @@
+"""
+Theme statistics for UI/UX Upgrade
+Maintains a cached summary of Theme Manager records
+"""
+
+import frappe
+
+THEME_STATS_CACHE_KEY = "ui_ux_upgrade:theme_stats"
+# Safety net for edits that bypass document hooks
+THEME_STATS_CACHE_TTL = 24 * 60 * 60
+
+def get_theme_stats():
+    """Get the theme summary, computing it only when it is not cached"""
+    stats = frappe.cache().get_value(THEME_STATS_CACHE_KEY)
+    
+    if stats is None:
+        stats = refresh_theme_stats()
+    
+    return stats
+
+def refresh_theme_stats():
+    """Recompute the theme summary and store it in the cache"""
+    stats = compute_theme_stats()
+    frappe.cache().set_value(THEME_STATS_CACHE_KEY, stats, expires_in_sec=THEME_STATS_CACHE_TTL)
+    return stats
+
+def compute_theme_stats():
+    """Compute every theme statistic with a single aggregate query"""
+    groups = frappe.db.sql("""
+        select
+            primary_color,
+            secondary_color,
+            count(*) as theme_count,
+            count(nullif(css_code, '')) as themes_with_css,
+            coalesce(sum(length(css_code)), 0) as css_bytes
+        from `tabTheme Manager`
+        group by primary_color, secondary_color
+    """, as_dict=True)
+    
+    colors = set()
+    for group in groups:
+        colors.update(color for color in (group.primary_color, group.secondary_color) if color)
+    
+    return {
+        "theme_count": sum(group.theme_count for group in groups),
+        "themes_with_css": sum(group.themes_with_css for group in groups),
+        "css_bytes": int(sum(group.css_bytes for group in groups)),
+        "colors": sorted(colors)
+    }
+
+def on_theme_change(doc=None, method=None):
+    """Refresh the theme summary once the Theme Manager change is committed"""
+    frappe.db.after_commit.add(refresh_theme_stats)
@@ -0,0 +1 @@
+# UI Settings Module
\ No newline at end of file
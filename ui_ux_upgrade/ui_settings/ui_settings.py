@@ -0,0 +1,126 @@
+"""
+UI Settings access for UI/UX Upgrade
+Serves the single UI Settings document from process memory, backed by Redis
+"""
+
+import frappe
+import os
+import threading
+import time
+from collections import OrderedDict
+from frappe.utils import cint
+
+UI_SETTINGS_DOCTYPE = "UI Settings"
+UI_SETTINGS_FLAGS = ("enable_animations", "enable_glassmorphism", "enable_shadows")
+DEFAULT_UI_SETTINGS = {
+    "enable_animations": 1,
+    "modern_theme": "Default",
+    "enable_glassmorphism": 1,
+    "enable_shadows": 1
+}
+
+# Shared tier: the settings of a site, as a plain dict
+UI_SETTINGS_CACHE_KEY = "ui_ux_upgrade:ui_settings"
+
+# Process tier: settings per site, least recently used evicted first. Saving UI
+# Settings publishes the site name on the channel below so every process drops
+# its copy; the TTL bounds staleness if a message is missed while reconnecting
+INVALIDATION_CHANNEL = "ui_ux_upgrade:ui_settings_invalidate"
+LOCAL_CACHE_SIZE = 64
+LOCAL_CACHE_TTL = 5 * 60
+
+_local_cache = OrderedDict()
+_local_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+
+def get_ui_settings():
+    """Get UI Settings from process memory, then Redis, then the database"""
+    site = frappe.local.site
+    settings = get_local_settings(site)
+    
+    if settings is None:
+        start_invalidation_listener()
+        settings = frappe.cache().get_value(UI_SETTINGS_CACHE_KEY)
+    
+        if settings is None:
+            settings = load_ui_settings()
+            frappe.cache().set_value(UI_SETTINGS_CACHE_KEY, settings)
+    
+        set_local_settings(site, settings)
+    
+    # Callers get their own copy so they can't change the cached one
+    return frappe._dict(settings)
+
+def load_ui_settings():
+    """Read UI Settings from the database, filling in defaults for unset fields"""
+    values = frappe.db.get_singles_dict(UI_SETTINGS_DOCTYPE)
+    
+    settings = {}
+    for fieldname, default in DEFAULT_UI_SETTINGS.items():
+        value = values.get(fieldname)
+        if value is None or value == "":
+            value = default
+        settings[fieldname] = cint(value) if fieldname in UI_SETTINGS_FLAGS else value
+    
+    return settings
+
+def get_local_settings(site):
+    with _local_lock:
+        entry = _local_cache.get(site)
+        if not entry:
+            return None
+    
+        expires_at, settings = entry
+        if expires_at < time.monotonic():
+            del _local_cache[site]
+            return None
+    
+        _local_cache.move_to_end(site)
+        return settings
+
+def set_local_settings(site, settings):
+    with _local_lock:
+        _local_cache[site] = (time.monotonic() + LOCAL_CACHE_TTL, settings)
+        _local_cache.move_to_end(site)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+def drop_local_settings(site):
+    with _local_lock:
+        _local_cache.pop(site, None)
+
+def start_invalidation_listener():
+    """Subscribe this process to invalidation messages, once per process"""
+    global _listener, _listener_pid
+    
+    # Threads don't survive a fork, so a forked worker starts its own
+    if _listener and _listener.is_alive() and _listener_pid == os.getpid():
+        return
+    
+    try:
+        pubsub = frappe.cache().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: on_invalidation_message})
+        _listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        _listener_pid = os.getpid()
+    except Exception:
+        # The local TTL still bounds staleness without the listener
+        _listener = None
+
+def on_invalidation_message(message):
+    drop_local_settings(frappe.safe_decode(message["data"]))
+
+def clear_ui_settings_cache(doc=None, method=None):
+    """Drop cached UI Settings in Redis and in every process; hooked to UI Settings saves"""
+    site = frappe.local.site
+    
+    def invalidate():
+        frappe.cache().delete_value(UI_SETTINGS_CACHE_KEY)
+        drop_local_settings(site)
+        frappe.cache().publish(INVALIDATION_CHANNEL, site)
+    
+    invalidate()
+    if doc:
+        # Again once the change is committed, in case another request cached
+        # the old values in the meantime
+        frappe.db.after_commit.add(invalidate)
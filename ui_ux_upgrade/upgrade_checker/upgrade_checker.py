@@ -5,17 +5,138 @@ Checks for available updates and new features
 
 import frappe
 import requests
+import functools
 import json
+import os
+import random
+import threading
+import time
+import tomllib
 from frappe import _
+from requests.adapters import HTTPAdapter
 from packaging import version
-import re
+import ui_ux_upgrade
+
+GITHUB_REPO = "mknoufi/ui-ux-upgrade"
+DEFAULT_VERSION = "1.0.0"
+
+# Packaged app version, resolved once at import
+_APP_VERSION = getattr(ui_ux_upgrade, "__version__", None)
+
+# Version read from pyproject.toml, keyed by the file's mtime
+_pyproject_version = {"mtime": None, "version": DEFAULT_VERSION}
+
+# GitHub API endpoint for latest release (override with `ui_ux_upgrade_release_url`
+# in site_config.json, e.g. to point at a local stub server)
+RELEASE_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+
+# Release metadata cache
+RELEASE_CACHE_KEY = "ui_ux_upgrade:latest_release"
+RELEASE_CACHE_TTL = 6 * 60 * 60  # seconds a cached release is considered fresh
+RELEASE_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds a stale entry is kept for revalidation
+
+# Release entry shared by all sites on the bench, relative to the sites folder
+BENCH_RELEASE_FILE = ".ui_ux_upgrade_release.json"
+
+# Only these release fields are used, so only these are cached
+RELEASE_FIELDS = ("tag_name", "body", "html_url", "published_at")
+
+# HTTP client policy for release fetches
+RELEASE_FETCH_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+RELEASE_FETCH_RETRIES = 2  # retries after the first attempt
+RELEASE_FETCH_DEADLINE = 10  # seconds across all attempts, backoff included
+RELEASE_FETCH_BACKOFF = 0.5  # base seconds for exponential backoff
+RELEASE_FETCH_BACKOFF_MAX = 4  # cap on a single backoff sleep
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Circuit breaker: after this many consecutive failures, skip the network for
+# the cooldown period and keep serving the cached release
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 5 * 60
+
+# Latency samples of recent release fetches
+RELEASE_FETCH_METRICS_KEY = "ui_ux_upgrade:release_fetch_metrics"
+RELEASE_FETCH_METRICS_SIZE = 100
+
+# Background checks are coalesced into a single queued job per repo; users who
+# asked while it was in flight are notified when it completes
+UPGRADE_CHECK_JOB_ID = f"ui_ux_upgrade_check::{GITHUB_REPO}"
+UPGRADE_CHECK_WAITERS_KEY = "ui_ux_upgrade:upgrade_check_waiters"
+# Set when a caller asked for an Upgrade Check record from a queued check
+UPGRADE_CHECK_RECORD_KEY = "ui_ux_upgrade:upgrade_check_record_requested"
+
+# Scheduled checks notify every System Manager from one queued job: one
+# Notification Log bulk insert, then a realtime event to each user's room
+UPGRADE_NOTIFICATION_JOB_ID = f"ui_ux_upgrade_notify::{GITHUB_REPO}"
+UPGRADE_NOTIFICATION_ROLE = "System Manager"
+
+class CircuitBreaker:
+    """Per-process circuit breaker guarding an unreliable remote call"""
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow_request(self):
+        """Closed and half-open circuits let a call through; open ones do not"""
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed trial call in half-open state re-opens immediately
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+_http_session = None
+release_circuit = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN)
+
+def get_http_session():
+    """Get the process-wide pooled session used for release fetches"""
+    global _http_session
+
+    if _http_session is None:
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "ui-ux-upgrade-app"
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _http_session = session
+
+    return _http_session
 
-@frappe.whitelist()
 def check_for_upgrades():
-    """Check for available upgrades from GitHub releases"""
+    """Check for available upgrades, from the release cache when possible"""
     try:
-        current_version = get_current_version()
         latest_release = get_latest_release()
+    except Exception as e:
+        return get_upgrade_check_error(e)
+    
+    return build_upgrade_status(latest_release)
+
+def build_upgrade_status(latest_release):
+    """Compare a release from GitHub with the installed version"""
+    try:
+        current_version = get_current_version()
         
         if not latest_release:
             return {
@@ -25,7 +146,7 @@ def check_for_upgrades():
         
         latest_version = latest_release.get("tag_name", "").lstrip("v")
         
-        if version.parse(latest_version) > version.parse(current_version):
+        if parse_version(latest_version) > parse_version(current_version):
             return {
                 "success": True,
                 "update_available": True,
@@ -45,62 +166,420 @@ def check_for_upgrades():
             }
             
     except Exception as e:
-        frappe.log_error(f"Upgrade check failed: {str(e)}", "UI/UX Upgrade Checker")
-        return {
-            "success": False,
-            "message": _("Failed to check for updates: {0}").format(str(e))
-        }
+        return get_upgrade_check_error(e)
+
+def get_upgrade_check_error(e):
+    """Log a failed upgrade check and build its result"""
+    frappe.log_error(f"Upgrade check failed: {str(e)}", "UI/UX Upgrade Checker")
+    return {
+        "success": False,
+        "message": _("Failed to check for updates: {0}").format(str(e))
+    }
 
 def get_current_version():
-    """Get current version from hooks.py or pyproject.toml"""
+    """Get current version of the app, resolved once per process"""
+    if _APP_VERSION:
+        return _APP_VERSION
+
+    # No packaged version: fall back to pyproject.toml, re-reading it only
+    # when the file changes
+    path = frappe.get_app_path("ui_ux_upgrade", "..", "pyproject.toml")
     try:
-        # Try to get from app info first
-        from ui_ux_upgrade import __version__
-        return __version__
-    except (ImportError, AttributeError):
-        # Fallback to reading pyproject.toml
-        try:
-            import toml
-            with open(frappe.get_app_path("ui_ux_upgrade", "..", "pyproject.toml"), "r") as f:
-                data = toml.load(f)
-                return data.get("project", {}).get("version", "1.0.0")
-        except:
-            # Fallback to manual parsing if toml not available
-            try:
-                with open(frappe.get_app_path("ui_ux_upgrade", "..", "pyproject.toml"), "r") as f:
-                    content = f.read()
-                    # Simple regex to extract version
-                    import re
-                    version_match = re.search(r'version\s*=\s*["\']([^"\']+)["\']', content)
-                    if version_match:
-                        return version_match.group(1)
-            except:
-                pass
-            return "1.0.0"
-
-def get_latest_release():
-    """Get latest release information from GitHub"""
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return DEFAULT_VERSION
+
+    if _pyproject_version["mtime"] != mtime:
+        _pyproject_version.update(mtime=mtime, version=read_pyproject_version(path))
+
+    return _pyproject_version["version"]
+
+def read_pyproject_version(path):
+    """Read the project version from a pyproject.toml file"""
     try:
-        # GitHub API endpoint for latest release
-        url = "https://api.github.com/repos/mknoufi/ui-ux-upgrade/releases/latest"
-        
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "ui-ux-upgrade-app"
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            frappe.log_error(f"GitHub API returned status {response.status_code}", "UI/UX Upgrade Checker")
-            return None
-            
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        frappe.log_error(f"Failed to read version from {path}: {str(e)}", "UI/UX Upgrade Checker")
+        return DEFAULT_VERSION
+
+    return data.get("project", {}).get("version", DEFAULT_VERSION)
+
+@functools.lru_cache(maxsize=128)
+def parse_version(value):
+    """Parse a version string, memoized for repeated comparisons"""
+    return version.parse(value)
+
+def get_latest_release(force=False):
+    """Get latest release information, served from the release cache when possible"""
+    entry = get_cached_release_entry()
+
+    if entry and not force:
+        if is_release_entry_fresh(entry):
+            return entry.get("release")
+
+        if frappe.conf.get("ui_ux_upgrade_stale_while_revalidate", 1):
+            # Serve the stale release now and revalidate it in the background
+            enqueue_upgrade_check()
+            return entry.get("release")
+
+    return refresh_release_cache()
+
+def refresh_release_cache():
+    """Revalidate the cached release against GitHub and update the cache"""
+    entry = get_cached_release_entry()
+    url = frappe.conf.get("ui_ux_upgrade_release_url") or RELEASE_URL
+
+    if url == RELEASE_URL:
+        # Another site on this bench, or the fleet check, may have fetched it
+        bench_entry = read_bench_release(frappe.local.sites_path)
+        if bench_entry and is_release_entry_fresh(bench_entry) and (
+            not entry or bench_entry["fetched_at"] > entry.get("fetched_at", 0)
+        ):
+            frappe.cache().set_value(RELEASE_CACHE_KEY, bench_entry, expires_in_sec=RELEASE_CACHE_MAX_AGE)
+            return bench_entry["release"]
+
+    if not release_circuit.allow_request():
+        # Recent fetches kept failing; don't spend another timeout on them
+        return entry.get("release") if entry else None
+
+    started = time.monotonic()
+    status = None
+
+    try:
+        status, release, headers = fetch_release(
+            url,
+            etag=entry.get("etag") if entry else None,
+            last_modified=entry.get("last_modified") if entry else None,
+        )
     except requests.RequestException as e:
+        release_circuit.record_failure()
         frappe.log_error(f"Network error checking for updates: {str(e)}", "UI/UX Upgrade Checker")
+        # Keep serving the last known release rather than failing outright
+        return entry.get("release") if entry else None
+    finally:
+        record_release_fetch(time.monotonic() - started, status)
+
+    if status in RETRYABLE_STATUS_CODES:
+        release_circuit.record_failure()
+    else:
+        release_circuit.record_success()
+
+    updated = update_release_entry(entry, status, release, headers)
+    if not updated:
+        frappe.log_error(f"GitHub API returned status {status}", "UI/UX Upgrade Checker")
+        return entry.get("release") if entry else None
+
+    frappe.cache().set_value(RELEASE_CACHE_KEY, updated, expires_in_sec=RELEASE_CACHE_MAX_AGE)
+    if url == RELEASE_URL:
+        write_bench_release(frappe.local.sites_path, updated)
+    return updated["release"]
+
+def update_release_entry(entry, status, release, headers):
+    """Apply a fetch response to a cache entry; None if the response is unusable"""
+    if status == 304 and entry:
+        # Not modified: only the freshness timestamp changes
+        return {**entry, "fetched_at": time.time()}
+
+    if status == 200:
+        return {
+            "release": {field: release.get(field) for field in RELEASE_FIELDS},
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+
+    return None
+
+def get_bench_release_path(sites_path):
+    """Release file shared by every site on the bench"""
+    return os.path.join(sites_path, BENCH_RELEASE_FILE)
+
+def read_bench_release(sites_path):
+    """Read the bench-wide release entry, if one has been written"""
+    try:
+        with open(get_bench_release_path(sites_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
         return None
 
+def write_bench_release(sites_path, entry):
+    """Atomically replace the bench-wide release entry"""
+    path = get_bench_release_path(sites_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        frappe.log_error(f"Failed to write {path}: {str(e)}", "UI/UX Upgrade Checker")
+
+def insert_upgrade_check_records(results):
+    """Bulk insert Upgrade Check rows for successful check results"""
+    now = frappe.utils.now()
+    rows = [
+        (
+            frappe.generate_hash(length=10), now, now, frappe.session.user, frappe.session.user, 0,
+            result.get("current_version"),
+            result.get("latest_version"),
+            int(bool(result.get("update_available"))),
+            now,
+            result.get("release_notes", ""),
+            result.get("release_url", ""),
+            "Checked"
+        )
+        for result in results
+        if result.get("success")
+    ]
+
+    if rows:
+        frappe.db.bulk_insert(
+            "Upgrade Check",
+            fields=[
+                "name", "creation", "modified", "owner", "modified_by", "docstatus",
+                "current_version", "latest_version", "update_available", "last_checked",
+                "release_notes", "release_url", "status"
+            ],
+            values=rows
+        )
+
+    return [row[0] for row in rows]
+
+def fetch_release(url, etag=None, last_modified=None, timeout=RELEASE_FETCH_TIMEOUT,
+                  retries=RELEASE_FETCH_RETRIES, deadline=RELEASE_FETCH_DEADLINE):
+    """Fetch release metadata with a conditional GET.
+
+    Connection errors and retryable status codes are retried with jittered
+    exponential backoff, as long as another attempt fits within ``deadline``
+    seconds of the first. Read timeouts are not retried. Returns a
+    ``(status_code, release, headers)`` tuple; ``release`` is None unless the
+    server answered 200.
+    """
+    headers = {}
+
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    connect_timeout, read_timeout = timeout
+    give_up_at = time.monotonic() + deadline
+
+    for attempt in range(retries + 1):
+        error = None
+        remaining = max(0.1, give_up_at - time.monotonic())
+        try:
+            response = get_http_session().get(
+                url, headers=headers, timeout=(connect_timeout, min(read_timeout, remaining))
+            )
+        except requests.ReadTimeout:
+            # A slow upstream stays slow; retrying would only hold the worker longer
+            raise
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                break
+
+        # Full jitter keeps workers on many sites from retrying in lockstep
+        backoff = random.uniform(0, min(RELEASE_FETCH_BACKOFF_MAX, RELEASE_FETCH_BACKOFF * 2 ** attempt))
+        if attempt == retries or time.monotonic() + backoff + connect_timeout >= give_up_at:
+            if error:
+                raise error
+            break
+
+        time.sleep(backoff)
+
+    release = response.json() if response.status_code == 200 else None
+    return response.status_code, release, response.headers
+
+def record_release_fetch(duration, status):
+    """Append a release fetch sample to the latency ring buffer"""
+    sample = json.dumps({
+        "timestamp": time.time(),
+        "duration_ms": round(duration * 1000, 2),
+        "status": status,
+        "circuit": release_circuit.state,
+    })
+    frappe.cache().lpush(RELEASE_FETCH_METRICS_KEY, sample)
+    frappe.cache().ltrim(RELEASE_FETCH_METRICS_KEY, 0, RELEASE_FETCH_METRICS_SIZE - 1)
+
+@frappe.whitelist()
+def get_release_fetch_metrics():
+    """Get latency statistics for recent release fetches"""
+    frappe.only_for("System Manager")
+
+    samples = [
+        json.loads(sample)
+        for sample in frappe.cache().lrange(RELEASE_FETCH_METRICS_KEY, 0, -1)
+    ]
+    durations = sorted(sample["duration_ms"] for sample in samples)
+
+    def percentile(p):
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(len(durations) * p))]
+
+    return {
+        "count": len(samples),
+        "failures": len([s for s in samples if s["status"] in (None,) + RETRYABLE_STATUS_CODES]),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": durations[-1] if durations else None,
+        "circuit": release_circuit.state,
+        "samples": samples[:10]
+    }
+
+def get_cached_release_entry():
+    """Get the cached release entry (release, validators and fetch time)"""
+    return frappe.cache().get_value(RELEASE_CACHE_KEY)
+
+def is_release_entry_fresh(entry):
+    """Check whether a cached release entry is still within its TTL"""
+    ttl = frappe.conf.get("ui_ux_upgrade_release_ttl") or RELEASE_CACHE_TTL
+    return time.time() - entry.get("fetched_at", 0) < ttl
+
+def clear_release_cache():
+    """Drop the cached release so the next check fetches from GitHub"""
+    frappe.cache().delete_value(RELEASE_CACHE_KEY)
+
+def get_cached_upgrade_status(record=False):
+    """Get upgrade status without blocking on GitHub.
+
+    Answers from the release cache when it holds an entry; on a cold cache a
+    background check is queued and the result is pushed to the caller over
+    the ``upgrade_available`` realtime event. With ``record``, the queued
+    check also saves an Upgrade Check record.
+    """
+    if get_cached_release_entry():
+        return check_for_upgrades()
+
+    enqueue_upgrade_check(notify_user=frappe.session.user, record=record)
+    return {
+        "success": True,
+        "queued": True,
+        "message": _("Checking for updates. You will be notified when the check completes.")
+    }
+
+def enqueue_upgrade_check(notify_user=None, record=False):
+    """Queue a background upgrade check, sharing any check already in flight"""
+    if notify_user:
+        frappe.cache().sadd(UPGRADE_CHECK_WAITERS_KEY, notify_user)
+    if record:
+        frappe.cache().set_value(UPGRADE_CHECK_RECORD_KEY, 1)
+
+    frappe.enqueue(
+        "ui_ux_upgrade.upgrade_checker.upgrade_checker.run_upgrade_check_job",
+        queue="short",
+        job_id=UPGRADE_CHECK_JOB_ID,
+        deduplicate=True,
+    )
+
+def run_upgrade_check_job():
+    """Background job: revalidate the release cache and notify waiting users"""
+    # Built from the release just fetched; going through the cache again
+    # would fetch a second time whenever this fetch failed
+    result = build_upgrade_status(refresh_release_cache())
+
+    if frappe.cache().get_value(UPGRADE_CHECK_RECORD_KEY):
+        frappe.cache().delete_value(UPGRADE_CHECK_RECORD_KEY)
+        insert_upgrade_check_records([result])
+
+    waiters = frappe.cache().smembers(UPGRADE_CHECK_WAITERS_KEY)
+    if waiters:
+        frappe.cache().srem(UPGRADE_CHECK_WAITERS_KEY, *waiters)
+
+    message = get_upgrade_notification(result)
+    for user in waiters:
+        frappe.publish_realtime("upgrade_available", message, user=frappe.safe_decode(user))
+
+    return result
+
+def get_upgrade_notification(result):
+    """Build the ``upgrade_available`` realtime payload for a check result"""
+    message = {"status": result}
+
+    if result.get("success") and result.get("update_available"):
+        message.update({
+            "title": _("UI/UX Upgrade Update Available"),
+            "message": _("Version {0} is available. Current version: {1}").format(
+                result.get("latest_version"),
+                result.get("current_version")
+            ),
+            "indicator": "blue"
+        })
+
+    return message
+
+def enqueue_upgrade_notification(result):
+    """Queue the notification of System Managers about an available update"""
+    frappe.enqueue(
+        "ui_ux_upgrade.upgrade_checker.upgrade_checker.notify_system_managers",
+        queue="short",
+        job_id=UPGRADE_NOTIFICATION_JOB_ID,
+        deduplicate=True,
+        result=result,
+    )
+
+def notify_system_managers(result):
+    """Background job: write Notification Logs for and alert every System Manager"""
+    users = get_system_managers()
+    if not users:
+        return
+
+    message = get_upgrade_notification(result)
+    insert_upgrade_notification_logs(users, message)
+
+    # Each recipient's own room, so other users never see who was notified;
+    # all from this one background job rather than the scheduler or a request
+    for user in users:
+        frappe.publish_realtime("upgrade_available", message, user=user)
+
+def get_system_managers():
+    """Enabled desk users with the System Manager role, in one query"""
+    return frappe.db.sql_list("""
+        select distinct `tabUser`.name
+        from `tabUser`
+        inner join `tabHas Role`
+            on `tabHas Role`.parent = `tabUser`.name and `tabHas Role`.parenttype = 'User'
+        where `tabHas Role`.role = %(role)s
+            and `tabUser`.enabled = 1
+            and `tabUser`.user_type = 'System User'
+    """, {"role": UPGRADE_NOTIFICATION_ROLE})
+
+def insert_upgrade_notification_logs(users, message):
+    """Bulk insert a Notification Log per user, skipping users already notified"""
+    subject = message["message"]
+    release = message.get("status") or {}
+    details = release.get("release_notes") or release.get("release_url") or ""
+    notified = set(frappe.get_all(
+        "Notification Log",
+        filters={"subject": subject, "for_user": ["in", users]},
+        pluck="for_user"
+    ))
+
+    now = frappe.utils.now()
+    rows = [
+        (
+            frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", 0,
+            subject, details, user, "Alert", 0
+        )
+        for user in users
+        if user not in notified
+    ]
+
+    if rows:
+        frappe.db.bulk_insert(
+            "Notification Log",
+            fields=[
+                "name", "creation", "modified", "owner", "modified_by", "docstatus",
+                "subject", "email_content", "for_user", "type", "read"
+            ],
+            values=rows
+        )
+        frappe.db.commit()
+
 @frappe.whitelist()
 def get_upgrade_instructions():
     """Get upgrade instructions for the app"""
@@ -117,27 +596,17 @@ def get_upgrade_instructions():
         "support_url": "https://github.com/mknoufi/ui-ux-upgrade/issues"
     }
 
-@frappe.whitelist()
 def schedule_upgrade_check():
-    """Schedule automatic upgrade checks"""
+    """Scheduled job: revalidate the release cache and notify about updates"""
     try:
-        # This would be called by a scheduled job
-        result = check_for_upgrades()
+        # Revalidate the cached release here so desk requests keep hitting a
+        # fresh cache; a failed fetch is not retried until the next run
+        result = build_upgrade_status(refresh_release_cache())
         
         if result.get("success") and result.get("update_available"):
-            # Create a notification for system managers
-            frappe.publish_realtime(
-                "upgrade_available",
-                {
-                    "title": _("UI/UX Upgrade Update Available"),
-                    "message": _("Version {0} is available. Current version: {1}").format(
-                        result.get("latest_version"),
-                        result.get("current_version")
-                    ),
-                    "indicator": "blue"
-                },
-                user=frappe.session.user
-            )
+            # The scheduler runs as Administrator, so notify every System
+            # Manager from a background job instead of the session user
+            enqueue_upgrade_notification(result)
             
         return result
         
@@ -0,0 +1,14 @@
+"""
+Request hooks for UI/UX Upgrade
+Kept minimal: they run on every request in the bench
+"""
+
+from ui_ux_upgrade.profiler.request_profiler import start_sample, finish_sample
+
+def before_request():
+    """Start a profiler sample for this request when sampling is enabled"""
+    start_sample()
+
+def after_request(response=None, request=None):
+    """Record the profiler sample started in before_request"""
+    finish_sample(response)